@@ -0,0 +1,3 @@
+from page2 import main
+
+main()
@@ -0,0 +1,40 @@
+import argparse
+import random
+import time
+
+from benchmarks.bench_search import make_rows
+from benchmarks.generate import make_catalogue
+from search import SearchEngine
+
+
+def run(size, queries, catalogue="generated"):
+    rows = list(make_catalogue(size)) if catalogue == "generated" else make_rows(size)
+    start = time.perf_counter()
+    engine = SearchEngine(rows)
+    build = time.perf_counter() - start
+    print(f"{size} rows, {len(engine.terms)} terms indexed in {build:.2f}s")
+
+    names = [row[0] for row in random.sample(rows, queries)]
+    cases = {
+        'exact': names,
+        'prefix': [name[:len(name) - 2] for name in names],
+        'typo': [name[:3] + name[4:] for name in names],
+    }
+    for label, batch in cases.items():
+        # Recall: how often the medicine the query was made from is among the top ten.
+        found = 0
+        start = time.perf_counter()
+        for name, query in zip(names, batch):
+            found += any(result.medicine == name for result in engine.search(query))
+        per_query = (time.perf_counter() - start) / len(batch)
+        print(f"  {label:<7} {per_query * 1e3:8.3f} ms/query  recall {found / len(batch):6.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure SearchEngine prefix and fuzzy query latency.")
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("--catalogue", choices=["generated", "simple"], default="generated",
+                        help="benchmarks/generate.py rows, or the numbered rows from bench_search")
+    args = parser.parse_args()
+    run(args.size, args.queries, args.catalogue)
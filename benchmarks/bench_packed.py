@@ -0,0 +1,53 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.bench_search import make_rows, timed, write_workbook
+from packed import PackedCatalogue, PackedSnapshot
+from storage import XlsxStorage
+from streaming import iter_rows
+
+
+def scan(path, name):
+    key = name.casefold()
+    for row in iter_rows(path):
+        if row[0] and row[0].casefold() == key:
+            return row
+    return None
+
+
+def run(sizes, lookups):
+    print(f"{'rows':>8} {'sidecar build (s)':>18} {'xlsx open+find (ms)':>20} {'bin open (ms)':>14} "
+          f"{'bin find (us)':>14} {'xlsx rows (s)':>14} {'bin rows (s)':>13} {'size xlsx/bin (MB)':>19}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = os.path.join(tmp, f"bench_{size}.xlsx")
+            write_workbook(path, make_rows(size))
+            names = [f"medicine {random.randrange(size)}" for _ in range(lookups)]
+
+            start = time.perf_counter()
+            for _ in XlsxStorage(path).rows():
+                pass
+            build = time.perf_counter() - start
+            catalogue = PackedCatalogue(path)
+
+            xlsx_find = timed(lambda: scan(path, names[0]), 1)
+            bin_open = timed(lambda: PackedSnapshot(catalogue.path).close(), 5)
+            snapshot = PackedSnapshot(catalogue.path)
+            bin_find = timed(lambda: [snapshot.find(name) for name in names], 1) / lookups
+            xlsx_rows = timed(lambda: sum(1 for _ in iter_rows(path)), 1)
+            bin_rows = timed(lambda: sum(1 for _ in PackedSnapshot(catalogue.path).rows()), 1)
+            sizes_mb = f"{os.path.getsize(path) / 1e6:.1f}/{os.path.getsize(catalogue.path) / 1e6:.1f}"
+            print(f"{size:>8} {build:>18.2f} {xlsx_find * 1e3:>20.1f} {bin_open * 1e3:>14.2f} "
+                  f"{bin_find * 1e6:>14.1f} {xlsx_rows:>14.2f} {bin_rows:>13.2f} {sizes_mb:>19}")
+            snapshot.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the packed binary sidecar with openpyxl reads of the workbook.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--lookups", type=int, default=1_000)
+    args = parser.parse_args()
+    run(args.sizes, args.lookups)
@@ -0,0 +1,74 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from openpyxl import Workbook, load_workbook
+
+from medicine_index import MedicineIndex
+from storage import HEADERS, XlsxStorage
+
+
+def make_rows(count):
+    rows = []
+    for n in range(count):
+        row = [f"Medicine {n}", f"Ingredient {n % 500} {n % 7 * 100}mg", "2024-01-01 00:00:00"]
+        for g in range(5):
+            row.extend([f"Generic {n}-{g}", f"Ingredient {n % 500}", f"{10 + g}", "Nausea"])
+        rows.append(row)
+    return rows
+
+
+def write_workbook(path, rows):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(HEADERS)
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+
+
+def scan_workbook(path, name):
+    wb = load_workbook(path)
+    ws = wb.active
+    try:
+        for row in ws.iter_rows(min_row=2, values_only=True):
+            if row[0] and row[0].lower() == name.lower():
+                return row
+    finally:
+        wb.close()
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def run(sizes, lookups, scan_repeat):
+    print(f"{'rows':>8} {'build (s)':>10} {'workbook scan (ms)':>19} {'index hit (us)':>15} {'speedup':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            rows = make_rows(size)
+            path = os.path.join(tmp, f"bench_{size}.xlsx")
+            write_workbook(path, rows)
+            names = [f"medicine {random.randrange(size)}" for _ in range(lookups)]
+
+            start = time.perf_counter()
+            index = MedicineIndex(XlsxStorage(path).rows())
+            build = time.perf_counter() - start
+
+            scan = timed(lambda: scan_workbook(path, names[0]), scan_repeat)
+            hit = timed(lambda: [index.get(name) for name in names], 1) / lookups
+            print(f"{size:>8} {build:>10.2f} {scan * 1e3:>19.1f} {hit * 1e6:>15.2f} {scan / hit:>9.0f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare workbook scans with MedicineIndex lookups.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--lookups", type=int, default=10_000)
+    parser.add_argument("--scan-repeat", type=int, default=1)
+    args = parser.parse_args()
+    run(args.sizes, args.lookups, args.scan_repeat)
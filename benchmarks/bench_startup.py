@@ -0,0 +1,57 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_PROBE = "import time; t = time.perf_counter(); import page2; print((time.perf_counter() - t) * 1e3)"
+
+
+def import_times(runs):
+    # A fresh interpreter each time, so nothing is already in sys.modules.
+    return [
+        float(subprocess.run([sys.executable, "-c", IMPORT_PROBE], cwd=ROOT, capture_output=True, text=True, check=True).stdout)
+        for _ in range(runs)
+    ]
+
+
+def app_times(store):
+    result = subprocess.run(
+        [sys.executable, os.path.join(ROOT, "page2.py"), "--store", store, "--startup-time"],
+        cwd=ROOT, capture_output=True, text=True, timeout=600,
+    )
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "app failed")
+    return {name: float(ms) for name, ms, _ in (line.split() for line in result.stdout.splitlines())}
+
+
+def run(runs, size):
+    report = {'import_ms': statistics.median(import_times(runs))}
+    print(f"import page2 (median of {runs}): {report['import_ms']:.1f} ms")
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        print("No display; skipping first-paint and time-to-ready")
+        return report
+    from benchmarks.generate import make_catalogue, write_catalogue
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = os.path.join(tmp, "catalogue.xlsx")
+        write_catalogue(store, make_catalogue(size))
+        for label in ("cold", "warm"):
+            times = app_times(store)
+            report[label] = times
+            print(f"{label}: " + "  ".join(f"{name} {ms:.1f} ms" for name, ms in times.items()))
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure app import time, time to first paint and time until the catalogue is ready.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--size", type=int, default=10_000, help="medicines in the synthetic catalogue")
+    parser.add_argument("--json", action="store_true", help="also print the results as JSON")
+    args = parser.parse_args()
+    report = run(args.runs, args.size)
+    if args.json:
+        print(json.dumps(report, indent=2))
@@ -0,0 +1,73 @@
+import argparse
+import csv
+import os
+import random
+
+from benchmarks.bench_search import write_workbook
+from storage import HEADERS, MAX_GENERICS, open_storage
+
+INGREDIENTS = [
+    "Paracetamol", "Ibuprofen", "Amoxicillin", "Azithromycin", "Cetirizine", "Metformin",
+    "Atorvastatin", "Amlodipine", "Omeprazole", "Pantoprazole", "Losartan", "Montelukast",
+    "Diclofenac", "Ciprofloxacin", "Levocetirizine", "Ranitidine", "Glimepiride", "Telmisartan",
+    "Rosuvastatin", "Domperidone", "Ondansetron", "Clopidogrel", "Aceclofenac", "Doxycycline",
+]
+SALTS = ["", "", "", " Hydrochloride", " Sodium", " Potassium", " Sulphate"]
+STRENGTHS = ["50mg", "100mg", "150mg", "250mg", "500mg", "650mg", "5mg", "10mg", "20mg", "40mg"]
+SIDE_EFFECTS = ["Nausea", "Headache", "Dizziness", "Drowsiness", "Stomach upset", "Rash", "None known"]
+SYLLABLES = ["ca", "lo", "vi", "ran", "zo", "mex", "pra", "tel", "dol", "fen", "cor", "zin", "tra", "mo", "nex", "sta"]
+# Relative frequency of 0..MAX_GENERICS listed generics per medicine.
+GENERIC_WEIGHTS = [10, 20, 25, 20, 15, 10]
+
+
+def brand(rng, n):
+    # Unique, pronounceable names; the numeric suffix keeps them distinct at any size.
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize() + f" {n}"
+
+
+def composition(rng):
+    parts = rng.choices(INGREDIENTS, k=rng.choice([1, 1, 1, 2]))
+    return " + ".join(f"{name}{rng.choice(SALTS)} {rng.choice(STRENGTHS)}" for name in dict.fromkeys(parts))
+
+
+def make_catalogue(count, seed=0, max_generics=MAX_GENERICS, start=0):
+    rng = random.Random(seed)
+    weights = (GENERIC_WEIGHTS + [5] * max_generics)[:max_generics + 1]
+    for n in range(start, start + count):
+        mix = composition(rng)
+        row = [brand(rng, n), mix, f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 10:00:00"]
+        for g in range(rng.choices(range(max_generics + 1), weights)[0]):
+            row.extend([brand(rng, f"{n}-{g}"), mix, f"₹{rng.uniform(2, 400):.2f}", rng.choice(SIDE_EFFECTS)])
+        yield row + [""] * (len(HEADERS) - len(row))
+
+
+def write_catalogue(path, rows):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(HEADERS)
+            writer.writerows(rows)
+    elif extension == ".xlsx":
+        write_workbook(path, rows)
+    else:
+        store = open_storage(path)
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= store.BULK_BATCH_SIZE:
+                store.append_many(batch)
+                batch = []
+        store.append_many(batch)
+        store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic medicine catalogue (XLSX, CSV or SQLite).")
+    parser.add_argument("count", type=int)
+    parser.add_argument("path")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-generics", type=int, default=MAX_GENERICS)
+    args = parser.parse_args()
+    write_catalogue(args.path, make_catalogue(args.count, args.seed, args.max_generics))
+    print(f"Wrote {args.count} medicines to {args.path}")
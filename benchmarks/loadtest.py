@@ -0,0 +1,69 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from urllib.parse import quote
+
+
+async def request(reader, writer, host, path):
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        if key.strip().lower() == "content-length":
+            length = int(value)
+    body = await reader.readexactly(length)
+    return status, body
+
+
+async def worker(host, port, paths, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            path = random.choice(paths)
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, host, path)
+            latencies.append(time.perf_counter() - start)
+            if status >= 400 and status != 404:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run(host, port, concurrency, duration):
+    reader, writer = await asyncio.open_connection(host, port)
+    _, body = await request(reader, writer, host, "/recent?count=50")
+    writer.close()
+    names = [m['name'] for m in json.loads(body)['results']] or ["paracetamol"]
+    paths = [f"/medicines/{quote(name)}" for name in names]
+    paths += [f"/search?q={quote(name[:max(3, len(name) - 2)])}" for name in names]
+    paths += ["/stats"]
+
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(host, port, paths, deadline, latencies, errors) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1e3
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e3
+    print(f"{len(latencies)} requests in {elapsed:.1f}s with {concurrency} connections")
+    print(f"  {len(latencies) / elapsed:,.0f} req/s, p50 {p50:.2f} ms, p99 {p99:.2f} ms, {len(errors)} errors")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test a running medicine server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.host, args.port, args.concurrency, args.duration))
@@ -0,0 +1,65 @@
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from core import MedicineService
+from storage import open_storage
+
+
+def writer(path, writer_id, count, threads, compact_threshold):
+    from concurrent.futures import ThreadPoolExecutor
+
+    service = MedicineService.open(path)
+    service.store.COMPACT_THRESHOLD = compact_threshold
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(lambda i: service.add([f"W{writer_id}-{i}", "Stress 1mg"]), range(count)))
+    service.close()
+
+
+def run(path, writers, rows, threads, compact_threshold):
+    open_storage(path).close()
+    start = time.perf_counter()
+    processes = [
+        multiprocessing.Process(target=writer, args=(path, w, rows, threads, compact_threshold))
+        for w in range(writers)
+    ]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+    elapsed = time.perf_counter() - start
+
+    store = open_storage(path)
+    store.compact()
+    names = Counter(row[0] for row in store.rows())
+    store.close()
+
+    expected = {f"W{w}-{i}" for w in range(writers) for i in range(rows)}
+    missing = expected - set(names)
+    duplicated = [name for name, n in names.items() if n > 1]
+    print(f"{writers} writers x {rows} rows ({threads} threads each) into {os.path.basename(path)} in {elapsed:.1f}s")
+    print(f"  stored {sum(names.values())}, expected {len(expected)}, missing {len(missing)}, duplicated {len(duplicated)}")
+    failed = [p.exitcode for p in processes if p.exitcode]
+    if missing or duplicated or failed:
+        print(f"  FAILED (writer exit codes: {failed})")
+        return False
+    print("  OK: no rows lost")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run concurrent writer processes against one store and check no rows are lost.")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--compact-threshold", type=int, default=10)
+    parser.add_argument("--format", choices=["xlsx", "db"], default="xlsx")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ok = run(os.path.join(tmp, f"stress.{args.format}"), args.writers, args.rows, args.threads, args.compact_threshold)
+    sys.exit(0 if ok else 1)
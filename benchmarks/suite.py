@@ -0,0 +1,141 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.generate import make_catalogue, write_catalogue
+from core import MedicineService
+from models import Medicine
+from stats import compute_statistics
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        'runs': len(samples),
+        'mean_ms': round(sum(samples) / len(samples) * 1e3, 4),
+        'p50_ms': round(samples[len(samples) // 2] * 1e3, 4),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1e3, 4),
+        'max_ms': round(samples[-1] * 1e3, 4),
+    }
+
+
+def measure(fn, args_list):
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def once(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return summarize([time.perf_counter() - start]), result
+
+
+def bench(path, size, queries, saves, bulk_rows):
+    results = {}
+    start = time.perf_counter()
+    write_catalogue(path, make_catalogue(size, seed=size))
+    results['generate'] = summarize([time.perf_counter() - start])
+    names = [row[0] for row in make_catalogue(size, seed=size)]
+    sample = random.Random(0).choices(names, k=queries)
+
+    # Cold startup reads the store itself; warm startup may use caches that cold one left behind.
+    results['startup_cold'], service = once(MedicineService.open(path).load)
+    service.close()
+    results['startup_warm'], service = once(MedicineService.open(path).load)
+    try:
+        results['exact_get'] = measure(service.get, [(name,) for name in sample])
+        results['exact_search'] = measure(service.search, [(name,) for name in sample])
+        results['store_find'] = measure(service.store.find, [(name,) for name in sample[:5]])
+        results['recent'] = measure(service.recent, [(5,)] * 20)
+        results['stats'] = measure(service.stats, [()] * 20)
+        results['stats_scan'], _ = once(compute_statistics, service.store)
+        results['single_save'] = measure(service.add, [
+            (Medicine.from_row(row),) for row in make_catalogue(saves, seed=-1, start=size)
+        ])
+        results['compact'], _ = once(service.compact)
+
+        bulk_path = os.path.join(os.path.dirname(path), f"bulk_{size}.csv")
+        write_catalogue(bulk_path, make_catalogue(bulk_rows, seed=-2, start=size + saves))
+        results['bulk_insert'], report = once(service.bulk_import, bulk_path)
+        results['bulk_insert']['rows'] = report.imported
+        results['bulk_insert']['rows_per_sec'] = round(report.imported / (results['bulk_insert']['mean_ms'] / 1e3))
+    finally:
+        service.close()
+    return results
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def compare(baseline, current):
+    print(f"\n{'case':<28}{'baseline p50 (ms)':>20}{'current p50 (ms)':>20}{'change':>10}")
+    for case, metrics in current['results'].items():
+        for metric, summary in metrics.items():
+            old = baseline['results'].get(case, {}).get(metric)
+            if not old or not old['p50_ms']:
+                continue
+            change = summary['p50_ms'] / old['p50_ms']
+            print(f"{case + ' ' + metric:<28}{old['p50_ms']:>20.3f}{summary['p50_ms']:>20.3f}{change:>9.2f}x")
+
+
+def run(sizes, formats, queries, saves, bulk_rows, output):
+    commit, dirty = git_commit()
+    report = {
+        'commit': commit,
+        'dirty': dirty,
+        'timestamp': datetime.now().isoformat(timespec="seconds"),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'parameters': {'queries': queries, 'saves': saves, 'bulk_rows': bulk_rows},
+        'results': {},
+    }
+    for size in sizes:
+        for fmt in formats:
+            with tempfile.TemporaryDirectory() as tmp:
+                case = f"{fmt}/{size}"
+                report['results'][case] = bench(os.path.join(tmp, f"catalogue.{fmt}"), size, queries, saves, min(bulk_rows, size))
+            summary = report['results'][case]
+            print(f"{case:<12} " + "  ".join(f"{name} {m['p50_ms']:.2f}ms" for name, m in summary.items()), flush=True)
+
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{commit or 'nogit'}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the core medicine operations on synthetic catalogues.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--formats", nargs="+", choices=["xlsx", "db"], default=["xlsx", "db"])
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("--saves", type=int, default=20)
+    parser.add_argument("--bulk-rows", type=int, default=10_000)
+    parser.add_argument("--output", help="JSON results path (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    args = parser.parse_args()
+    report = run(args.sizes, args.formats, args.queries, args.saves, args.bulk_rows, args.output)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), report)
@@ -0,0 +1,132 @@
+import argparse
+import csv
+import os
+import time
+from datetime import datetime
+
+from medicine_index import index_key
+from storage import open_storage, pad_row
+from streaming import iter_numbered_rows
+
+
+class ImportReport:
+    def __init__(self):
+        self.read = 0
+        self.imported = 0
+        self.rejected = []
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_sec(self):
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        return (f"Imported {self.imported} of {self.read} rows in {self.elapsed:.2f}s "
+                f"({self.rows_per_sec:,.0f} rows/sec), rejected {len(self.rejected)}")
+
+
+def numbered(rows):
+    # rows are (line number, cells) pairs; blank lines are skipped without being reported.
+    for line_no, row in rows:
+        if not any(cell is not None and str(cell).strip() for cell in row):
+            continue
+        if line_no == 1 and str(row[0]).strip().casefold() == "medicine name":
+            continue
+        yield line_no, row
+
+
+def read_source(path):
+    if os.path.splitext(path)[1].lower() in (".xlsx", ".xlsm"):
+        yield from numbered(iter_numbered_rows(path, min_row=1))
+        return
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from numbered(csv_lines(csv.reader(f)))
+
+
+def csv_lines(reader):
+    # Numbered by the physical line a row starts on, so quoted cells with newlines do not shift later rows.
+    line_no = 1
+    for row in reader:
+        yield line_no, row
+        line_no = reader.line_num + 1
+
+
+def validate(row, added_at):
+    row = ["" if cell is None else str(cell).strip() for cell in row]
+    while row and not row[-1]:
+        row.pop()
+    if not row:
+        return None, "empty row"
+    row = pad_row(row)
+    if not row[0]:
+        return None, "missing medicine name"
+    if not row[1]:
+        return None, "missing composition"
+    for i, start in enumerate(range(3, len(row), 4)):
+        group = row[start:start + 4]
+        if any(group[1:]) and not group[0]:
+            return None, f"generic {i + 1} has details but no name"
+    if not row[2]:
+        row[2] = added_at
+    return row, None
+
+
+def import_file(path, store, existing=(), batch_size=None):
+    batch_size = batch_size or store.BULK_BATCH_SIZE
+    report = ImportReport()
+    seen = set()
+    batch = []
+    added_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    start = time.perf_counter()
+    for line_no, raw in read_source(path):
+        report.read += 1
+        row, reason = validate(raw, added_at)
+        if row is not None:
+            key = index_key(row[0])
+            if key in seen or row[0] in existing:
+                row, reason = None, "duplicate medicine name"
+            else:
+                seen.add(key)
+        if row is None:
+            report.rejected.append((line_no, reason, list(raw)))
+            continue
+        batch.append(row)
+        if len(batch) >= batch_size:
+            store.append_many(batch)
+            report.imported += len(batch)
+            batch = []
+    if batch:
+        store.append_many(batch)
+        report.imported += len(batch)
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def write_rejects(report, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Line", "Reason", "Row"])
+        for line_no, reason, row in report.rejected:
+            writer.writerow([line_no, reason] + ["" if cell is None else cell for cell in row])
+
+
+if __name__ == "__main__":
+    from medicine_index import MedicineIndex
+
+    parser = argparse.ArgumentParser(description="Bulk import a supplier catalogue (CSV or XLSX) into the medicine store.")
+    parser.add_argument("source")
+    parser.add_argument("--store", default=os.environ.get("MEDICINE_STORE", "med2.xlsx"))
+    parser.add_argument("--rejects", help="write rejected rows with reasons to this CSV file")
+    parser.add_argument("--batch-size", type=int)
+    args = parser.parse_args()
+
+    store = open_storage(args.store)
+    report = import_file(args.source, store, MedicineIndex(store.rows()), args.batch_size)
+    store.close()
+    print(report.summary())
+    for line_no, reason, _ in report.rejected[:20]:
+        print(f"  line {line_no}: {reason}")
+    if len(report.rejected) > 20:
+        print(f"  ... and {len(report.rejected) - 20} more")
+    if args.rejects:
+        write_rejects(report, args.rejects)
@@ -0,0 +1,114 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+class LockTimeout(Exception):
+    pass
+
+
+class FileLock:
+    # Advisory lock shared by every process that opens the same store.
+    # With no timeout, acquire waits as long as the holder needs (a compaction can take
+    # minutes); the OS drops the lock if the holder dies, so this cannot wait on a crash.
+    def __init__(self, path, timeout=None, poll_interval=0.05):
+        self.path = path
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._fd = None
+        self._depth = 0
+        self._guard = threading.RLock()
+
+    def acquire(self):
+        self._guard.acquire()
+        if self._depth:
+            self._depth += 1
+            return
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while True:
+            try:
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    os.close(fd)
+                    self._guard.release()
+                    raise LockTimeout(f"Timed out waiting for {self.path}")
+                time.sleep(self.poll_interval)
+        self._fd = fd
+        self._depth = 1
+
+    def release(self):
+        self._depth -= 1
+        if not self._depth:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+            os.close(self._fd)
+            self._fd = None
+        self._guard.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class WriterQueue:
+    # Funnels inserts from many threads into one writer that commits them in groups.
+    MAX_GROUP = 500
+
+    def __init__(self, commit):
+        self.commit = commit
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="medicine-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, row):
+        future = Future()
+        self.queue.put((row, future))
+        return future
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            group = [item]
+            while len(group) < self.MAX_GROUP:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self.queue.put(None)
+                    break
+                group.append(item)
+            try:
+                self.commit([row for row, _ in group])
+            except Exception as e:
+                for _, future in group:
+                    future.set_exception(e)
+            else:
+                for _, future in group:
+                    future.set_result(None)
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
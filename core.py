@@ -0,0 +1,281 @@
+import os
+import threading
+import time
+from datetime import datetime
+
+from bulk_import import import_file
+from cache import LRUCache
+from concurrency import WriterQueue
+from ingredients import IngredientIndex
+from medicine_index import MedicineIndex, index_key
+from metrics import METRICS, incr, timed, timer
+from models import Medicine
+from prices import DEFAULT_CURRENCY
+from search import SearchEngine
+from stats import StatsAggregator, compute_statistics
+from storage import open_storage
+
+DETAIL_CACHE_SIZE = 256
+CHEAPEST_COUNT = 3
+
+
+def row_identity(row):
+    medicine = Medicine.from_row(row)
+    return medicine.name, medicine.composition, medicine.date_added
+
+
+class MedicineDetail:
+    __slots__ = ('medicine', 'ranked_generics', 'cheapest')
+
+    def __init__(self, medicine, cheapest=()):
+        self.medicine = medicine
+        self.ranked_generics = medicine.ranked_generics()
+        # Cheapest same-composition generics across the whole catalogue.
+        self.cheapest = list(cheapest)
+
+
+class MedicineService:
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, store):
+        self.store = store
+        # Serialises catalogue builds and writes; lookups read the indexes without it.
+        self.lock = threading.RLock()
+        # Guards only the ingredient and price index, so UI reads never wait on compaction or reloads.
+        self.ingredients_lock = threading.Lock()
+        self.index = None
+        self.aggregates = None
+        self.engine = None
+        self.ingredients = None
+        self.version = None
+        # Rows indexed so far and the identity of the last one, for tail-only refreshes.
+        self.row_count = 0
+        self.last_row = None
+        self.details = LRUCache(DETAIL_CACHE_SIZE)
+        self.reloads = 0
+        self.tail_refreshes = 0
+        self.writer = WriterQueue(self._commit)
+        self.compactor = None
+
+    @classmethod
+    def open(cls, path):
+        return cls(open_storage(path))
+
+    @classmethod
+    def shared(cls, path):
+        # One warm catalogue per store path for the whole process.
+        key = os.path.abspath(path)
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls.open(path)
+            return cls._shared[key]
+
+    @property
+    def ready(self):
+        return self.index is not None
+
+    @timed("service.load")
+    def load(self):
+        with self.lock:
+            version = self.store.version()
+            index = MedicineIndex()
+            aggregates = StatsAggregator()
+            ingredients = IngredientIndex()
+            seen = [0, None]
+            reading = [0.0]
+            started = time.perf_counter()
+
+            def stream():
+                # One lazy pass over the store feeds every index, so rows are never held twice.
+                rows = self.store.rows()
+                while True:
+                    start = time.perf_counter()
+                    row = next(rows, None)
+                    reading[0] += time.perf_counter() - start
+                    if row is None:
+                        break
+                    index.add(row)
+                    aggregates.add(row)
+                    ingredients.add(row)
+                    seen[0] += 1
+                    seen[1] = row
+                    yield row
+
+            engine = SearchEngine(stream())
+            # Sort the price lists here, in the loader thread, rather than on the first query.
+            ingredients.prices.sort()
+            # Whatever load spent outside the store is index building.
+            METRICS.observe("service.index_build", (time.perf_counter() - started - reading[0]) * 1e3)
+            self.index, self.aggregates, self.engine, self.ingredients = index, aggregates, engine, ingredients
+            self.row_count = seen[0]
+            incr("service.rows_loaded", seen[0])
+            self.last_row = row_identity(seen[1]) if seen[1] else None
+            self.version = version
+            self.details.clear()
+            self.reloads += 1
+        return self
+
+    def is_stale(self):
+        return self.ready and self.store.version() != self.version
+
+    def refresh_if_stale(self):
+        # Picks up rows written by other processes sharing the store.
+        with self.lock:
+            if not self.is_stale():
+                return False
+            with timer("service.refresh"):
+                version = self.store.version()
+                tail = list(self.store.rows(max(self.row_count - 1, 0)))
+                if self.row_count and (not tail or row_identity(tail[0]) != self.last_row):
+                    # Not a pure append (rows edited or removed elsewhere): rebuild everything.
+                    self.load()
+                    return True
+                for row in tail[1:] if self.row_count else tail:
+                    self._apply(row)
+                self.version = version
+                self.tail_refreshes += 1
+                return True
+
+    def _apply(self, row):
+        self.index.add(row)
+        self.aggregates.add(row)
+        self.engine.add(row)
+        with self.ingredients_lock:
+            self.ingredients.add(row)
+        # A new generic can become the cheapest equivalent shown in any other medicine's detail.
+        self.details.clear()
+        self.row_count += 1
+        self.last_row = row_identity(row)
+
+    @timed("service.get")
+    def get(self, name):
+        if self.ready:
+            return self.index.get(name)
+        row = self.store.find(name)
+        return Medicine.from_row(row) if row else None
+
+    @timed("service.search")
+    def search(self, query, limit=10):
+        if not self.ready:
+            medicine = self.get(query)
+            return [medicine] if medicine else []
+        return [self.index.get(result.medicine) for result in self.engine.search(query, limit)]
+
+    def count(self):
+        return len(self.index) if self.ready else 0
+
+    def browse(self, offset, limit):
+        return self.index.page(offset, limit) if self.ready else []
+
+    def browse_position(self, name):
+        return self.index.position(name) if self.ready else 0
+
+    @timed("service.suggest")
+    def suggest(self, query, limit=10):
+        return self.engine.search(query, limit) if self.ready else []
+
+    def cheapest_generic(self, name):
+        if not self.ready:
+            return None
+        with self.ingredients_lock:
+            return self.ingredients.cheapest_generic(name)
+
+    def cheapest_equivalents(self, name, k=5, currency=DEFAULT_CURRENCY):
+        if not self.ready:
+            return []
+        with self.ingredients_lock:
+            return self.ingredients.cheapest_equivalents(name, k, currency)
+
+    @timed("service.priced_between")
+    def priced_between(self, low=None, high=None, composition=None, limit=50, currency=DEFAULT_CURRENCY):
+        if not self.ready:
+            return []
+        with self.ingredients_lock:
+            return self.ingredients.priced_between(low, high, composition, limit, currency)
+
+    @timed("service.detail")
+    def detail(self, medicine):
+        # Built from the Medicine the caller already holds; nothing here reads the store.
+        if not self.ready:
+            return MedicineDetail(medicine)
+        return self.details.get(
+            index_key(medicine.name),
+            lambda: MedicineDetail(medicine, self.cheapest_equivalents(medicine.name, CHEAPEST_COUNT)),
+        )
+
+    def cache_stats(self):
+        return {
+            'row_count': self.row_count,
+            'reloads': self.reloads,
+            'tail_refreshes': self.tail_refreshes,
+            'details': self.details.stats(),
+        }
+
+    @timed("service.save")
+    def add(self, medicine):
+        if not isinstance(medicine, Medicine):
+            medicine = Medicine.from_row(medicine)
+        if not medicine.date_added:
+            medicine.date_added = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        row = medicine.to_row()
+        # Concurrent adds queue up behind the writer and are committed as one group.
+        self.writer.submit(row).result()
+        return Medicine.from_row(row)
+
+    @timed("service.commit")
+    def _commit(self, rows):
+        with self.lock:
+            before, after = self.store.append_group(rows)
+            incr("service.rows_saved", len(rows))
+            if self.ready:
+                for row in rows:
+                    self._apply(row)
+                self._advance_version(before, after)
+        if self.store.needs_compaction():
+            self._compact_in_background()
+
+    def _advance_version(self, before, after):
+        # Our own writes keep the snapshot current; anyone else's leave it stale.
+        if before == self.version:
+            self.version = after
+
+    @timed("service.stats")
+    def stats(self):
+        return self.aggregates.snapshot() if self.ready else compute_statistics(self.store)
+
+    @timed("service.recent")
+    def recent(self, count=5):
+        return [Medicine.from_row(row) for row in self.store.recent(count)]
+
+    @timed("service.bulk_import")
+    def bulk_import(self, path):
+        with self.lock:
+            report = import_file(path, self.store, self.index if self.ready else MedicineIndex(self.store.rows()))
+            if report.imported:
+                self.load()
+        return report
+
+    @timed("service.compact")
+    def compact(self):
+        with self.lock:
+            self._advance_version(*self.store.compact())
+
+    def _compact_in_background(self):
+        # The rows are already durable in the journal, so a failed compaction (a workbook held open
+        # in Excel, a full disk) is only counted as service.compact.errors and retried on a later save.
+        def run():
+            try:
+                self.compact()
+            except Exception:
+                pass
+
+        if self.compactor is None or not self.compactor.is_alive():
+            self.compactor = threading.Thread(target=run, name="medicine-compactor", daemon=True)
+            self.compactor.start()
+
+    def close(self):
+        self.writer.close()
+        if self.compactor is not None:
+            self.compactor.join()
+        self.store.close()
@@ -0,0 +1,121 @@
+import re
+from collections import defaultdict
+
+from medicine_index import index_key
+from prices import DEFAULT_CURRENCY, PriceIndex, parse_price
+from stats import generic_slots
+
+SEPARATOR_PATTERN = re.compile(r"\s*(?:\+|,|;|&|\band\b)\s*", re.IGNORECASE)
+STRENGTH_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(mcg|µg|mg|g|ml|iu|%)(?:\s*/\s*(\d+(?:\.\d+)?)?\s*(ml|g|tab))?(?!\w)", re.IGNORECASE)
+# Salt forms that name the same active ingredient for substitution purposes.
+SALT_WORDS = {"hydrochloride", "hcl", "monohydrate", "trihydrate"}
+# PriceIndex key for the catalogue-wide price list.
+ALL_PRICES = None
+
+
+def normalize_strength(match):
+    amount, unit, per_amount, per_unit = match.groups()
+    strength = f"{float(amount):g}{unit.lower().replace('µg', 'mcg')}"
+    if per_unit:
+        strength += f"/{float(per_amount):g}{per_unit.lower()}" if per_amount else f"/{per_unit.lower()}"
+    return strength
+
+
+def parse_composition(text):
+    pairs = []
+    if text is None:
+        return pairs
+    for part in SEPARATOR_PATTERN.split(str(text)):
+        match = STRENGTH_PATTERN.search(part)
+        strength = normalize_strength(match) if match else ""
+        name = STRENGTH_PATTERN.sub(" ", part) if match else part
+        # Digits stay part of the name: "Vitamin B12" and "Vitamin B6" are different ingredients.
+        words = [w for w in re.findall(r"[^\W_]+(?:-[^\W_]+)*", name.casefold()) if w not in SALT_WORDS]
+        if words:
+            pairs.append((" ".join(words), strength))
+    return pairs
+
+
+class Product:
+    __slots__ = ('kind', 'medicine', 'name', 'composition', 'price')
+
+    def __init__(self, kind, medicine, name, composition, price):
+        self.kind = kind
+        self.medicine = medicine
+        self.name = name
+        self.composition = composition
+        self.price = price
+
+    def __repr__(self):
+        return f"Product({self.kind!r}, {self.name!r}, {self.composition!r}, price={self.price})"
+
+
+class IngredientIndex:
+    def __init__(self, rows=()):
+        self.products = []
+        self.by_pair = defaultdict(list)
+        self.by_ingredient = defaultdict(list)
+        self.by_signature = defaultdict(list)
+        self.medicine_signatures = {}
+        self.prices = PriceIndex()
+        for row in rows:
+            self.add(row)
+
+    def add(self, row):
+        if not row or row[0] is None or not str(row[0]).strip():
+            return
+        medicine = str(row[0]).strip()
+        composition = row[1] if len(row) > 1 else None
+        signature = self._add_product(Product('medicine', medicine, medicine, composition, None))
+        self.medicine_signatures.setdefault(index_key(medicine), signature)
+        for generic in generic_slots(row):
+            # Prices are parsed once here; rankings and filters only compare the parsed amounts.
+            price = parse_price(generic[2]) if len(generic) > 2 else None
+            self._add_product(Product('generic', medicine, str(generic[0]).strip(), generic[1] if len(generic) > 1 else None, price))
+
+    def _add_product(self, product):
+        pairs = parse_composition(product.composition)
+        if not pairs:
+            return None
+        product_id = len(self.products)
+        self.products.append(product)
+        for pair in set(pairs):
+            self.by_pair[pair].append(product_id)
+            self.by_ingredient[pair[0]].append(product_id)
+        signature = frozenset(pairs)
+        self.by_signature[signature].append(product_id)
+        if product.price is not None:
+            self.prices.add(signature, product.price, product_id)
+            self.prices.add(ALL_PRICES, product.price, product_id)
+        return signature
+
+    def containing(self, ingredient, strength=None):
+        pairs = parse_composition(f"{ingredient} {strength or ''}")
+        if not pairs:
+            return []
+        name, parsed_strength = pairs[0]
+        ids = self.by_pair.get((name, parsed_strength), []) if parsed_strength else self.by_ingredient.get(name, [])
+        return [self.products[i] for i in ids]
+
+    def same_composition(self, composition):
+        return [self.products[i] for i in self.by_signature.get(frozenset(parse_composition(composition)), [])]
+
+    def equivalent_generics(self, medicine):
+        signature = self.medicine_signatures.get(index_key(medicine))
+        if not signature:
+            return []
+        return [self.products[i] for i in self.by_signature[signature] if self.products[i].kind == 'generic']
+
+    def cheapest_equivalents(self, medicine, k=5, currency=DEFAULT_CURRENCY):
+        signature = self.medicine_signatures.get(index_key(medicine))
+        if not signature:
+            return []
+        return [self.products[i] for i in self.prices.cheapest(signature, k, currency)]
+
+    def cheapest_generic(self, medicine):
+        cheapest = self.cheapest_equivalents(medicine, 1)
+        return cheapest[0] if cheapest else None
+
+    def priced_between(self, low=None, high=None, composition=None, limit=None, currency=DEFAULT_CURRENCY):
+        key = frozenset(parse_composition(composition)) if composition else ALL_PRICES
+        return [self.products[i] for i in self.prices.between(key, low, high, limit, currency)]
@@ -0,0 +1,90 @@
+import json
+import os
+import uuid
+
+TAIL_CHUNK = 4096
+
+
+class Journal:
+    def __init__(self, path):
+        self.path = path
+        self._pending = sum(1 for _ in self.rows())
+
+    def append(self, row):
+        self.append_many([row])
+
+    def append_many(self, rows):
+        lines = "".join(json.dumps(list(row), default=str) + "\n" for row in rows)
+        self._drop_torn_tail()
+        if not self.size():
+            # A fresh journal starts with its own id, so a compaction checkpoint can name it.
+            lines = json.dumps({'journal': uuid.uuid4().hex}) + "\n" + lines
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        self._pending += len(rows)
+
+    def _drop_torn_tail(self):
+        # A crash mid-write leaves a line without its newline; appending after it would glue the
+        # next row onto the fragment and lose that row too, so cut the file back to the last full line.
+        try:
+            f = open(self.path, "r+b")
+        except FileNotFoundError:
+            return
+        with f:
+            end = f.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                start = max(0, position - TAIL_CHUNK)
+                f.seek(start)
+                chunk = f.read(position - start)
+                if position == end and chunk.endswith(b"\n"):
+                    return
+                newline = chunk.rfind(b"\n")
+                if newline >= 0:
+                    position = start + newline + 1
+                    break
+                position = start
+            f.truncate(position)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def ident(self):
+        # None for a missing journal or one written before journals carried an id.
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                header = json.loads(f.readline())
+        except (OSError, ValueError):
+            return None
+        return header.get('journal') if isinstance(header, dict) else None
+
+    def rows(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    # A torn final line from a crash mid-write; drop it.
+                    continue
+                if isinstance(row, list):
+                    yield tuple(row)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._pending = 0
+
+    def __len__(self):
+        return self._pending
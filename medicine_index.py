@@ -0,0 +1,48 @@
+from bisect import bisect_left, insort
+
+from models import Medicine
+
+
+def index_key(name):
+    return str(name).strip().casefold()
+
+
+class MedicineIndex:
+    def __init__(self, rows=()):
+        self._medicines = {}
+        self._sorted = None
+        for row in rows:
+            self.add(row)
+
+    def add(self, row):
+        medicine = row if isinstance(row, Medicine) else Medicine.from_row(row or ())
+        if not medicine.name:
+            return
+        key = index_key(medicine.name)
+        # First occurrence wins, matching the old top-to-bottom scan.
+        if key not in self._medicines:
+            self._medicines[key] = medicine
+            # A single save slots into the existing order instead of forcing a full re-sort.
+            if self._sorted is not None:
+                insort(self._sorted, key)
+
+    def get(self, name):
+        return self._medicines.get(index_key(name))
+
+    def _order(self):
+        if self._sorted is None:
+            self._sorted = sorted(self._medicines)
+        return self._sorted
+
+    def page(self, offset, limit):
+        # Alphabetical paging; sorted once on first use and kept in order by add().
+        return [self._medicines[key] for key in self._order()[offset:offset + limit]]
+
+    def position(self, name):
+        return bisect_left(self._order(), index_key(name))
+
+    def __contains__(self, name):
+        return index_key(name) in self._medicines
+
+    def __len__(self):
+        return len(self._medicines)
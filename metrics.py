@@ -0,0 +1,183 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+
+# Latency bucket upper bounds in milliseconds; the last bucket catches everything slower.
+BUCKETS_MS = (0.1, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf"))
+PROFILE_DIR = os.environ.get("MEDICINE_PROFILE_DIR", "profiles")
+
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, ms):
+        self.buckets[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.min = ms if self.min is None else min(self.min, ms)
+        self.max = ms if self.max is None else max(self.max, ms)
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation.
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return round(min(bound, self.max), 3)
+        return round(self.max, 3)
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count, 3) if self.count else None,
+            'min_ms': None if self.min is None else round(self.min, 3),
+            'p50_ms': self.quantile(0.5),
+            'p95_ms': self.quantile(0.95),
+            'p99_ms': self.quantile(0.99),
+            'max_ms': None if self.max is None else round(self.max, 3),
+        }
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        # Name of the next timed operation to run under cProfile and tracemalloc.
+        self.capture = os.environ.get("MEDICINE_PROFILE") or None
+        self.captures = []
+
+    def incr(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name, ms):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(ms)
+
+    @contextmanager
+    def timer(self, name):
+        profiling = self._claim_capture(name)
+        if profiling:
+            import cProfile
+            import tracemalloc
+
+            profiler = cProfile.Profile()
+            tracemalloc.start()
+            profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.incr(f"{name}.errors")
+            raise
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1e3)
+            if profiling:
+                profiler.disable()
+                allocations = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+                self._write_capture(name, profiler, allocations)
+
+    def timed(self, name):
+        def decorate(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.timer(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def capture_next(self, name):
+        with self.lock:
+            self.capture = name
+
+    def _claim_capture(self, name):
+        if self.capture != name:
+            return False
+        import tracemalloc
+
+        with self.lock:
+            if self.capture != name or tracemalloc.is_tracing():
+                return False
+            self.capture = None
+            return True
+
+    def _write_capture(self, name, profiler, allocations):
+        import io
+        import pstats
+
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        base = os.path.join(PROFILE_DIR, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}")
+        profiler.dump_stats(base + ".prof")
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(30)
+        report.write("\nTop allocations\n")
+        for stat in allocations.statistics("lineno")[:20]:
+            report.write(f"{stat}\n")
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(report.getvalue())
+        with self.lock:
+            self.captures.append(base + ".prof")
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': dict(sorted(self.counters.items())),
+                'latency': {name: h.summary() for name, h in sorted(self.histograms.items())},
+            }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix="medicine"):
+        lines = []
+        with self.lock:
+            for name, value in sorted(self.counters.items()):
+                metric = f"{prefix}_{_metric_name(name)}_total"
+                lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+            for name, histogram in sorted(self.histograms.items()):
+                metric = f"{prefix}_{_metric_name(name)}_ms"
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, count in zip(BUCKETS_MS, histogram.buckets):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f'{metric}_bucket{{le="{le}"}} {cumulative}')
+                lines += [f"{metric}_sum {histogram.total:.3f}", f"{metric}_count {histogram.count}"]
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+def _metric_name(name):
+    return "".join(c if c.isalnum() else "_" for c in name)
+
+
+METRICS = Metrics()
+timer = METRICS.timer
+timed = METRICS.timed
+incr = METRICS.incr
@@ -0,0 +1,77 @@
+from prices import parse_price, price_key
+from storage import MAX_GENERICS
+
+GENERIC_WIDTH = 4
+
+
+def _text(value):
+    return "" if value is None else str(value).strip()
+
+
+class Generic:
+    __slots__ = ('name', 'composition', 'price', 'side_effects', 'parsed_price')
+    FIELDS = ('name', 'composition', 'price', 'side_effects')
+
+    def __init__(self, name, composition="", price="", side_effects=""):
+        self.name = name
+        self.composition = composition
+        self.price = price
+        self.side_effects = side_effects
+        # Parsed once when the record is built, so views can sort without re-reading the text.
+        self.parsed_price = parse_price(price)
+
+    def to_cells(self):
+        return [self.name, self.composition, self.price, self.side_effects]
+
+    def to_dict(self):
+        data = {field: getattr(self, field) for field in self.FIELDS}
+        price = self.parsed_price
+        data['parsed_price'] = price and {'amount': price.amount, 'currency': price.currency, 'unit': price.unit, 'quantity': price.quantity}
+        return data
+
+
+class Medicine:
+    __slots__ = ('name', 'composition', 'date_added', 'generics')
+
+    def __init__(self, name, composition="", date_added="", generics=()):
+        self.name = name
+        self.composition = composition
+        self.date_added = date_added
+        self.generics = list(generics)
+
+    @classmethod
+    def from_row(cls, row):
+        row = list(row) + [None] * (3 - len(row))
+        generics = []
+        for start in range(3, len(row), GENERIC_WIDTH):
+            cells = [_text(cell) for cell in row[start:start + GENERIC_WIDTH]]
+            if cells[0]:
+                generics.append(Generic(*cells))
+        return cls(_text(row[0]), _text(row[1]), _text(row[2]), generics)
+
+    @classmethod
+    def from_dict(cls, data):
+        generics = [Generic(*(_text(g.get(field)) for field in Generic.FIELDS)) for g in data.get('generics', ())]
+        return cls(_text(data.get('name')), _text(data.get('composition')), _text(data.get('date_added')), generics)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'composition': self.composition,
+            'date_added': self.date_added,
+            'generics': [generic.to_dict() for generic in self.generics],
+        }
+
+    def ranked_generics(self):
+        # Cheapest first; generics without a usable price keep their listed order at the end.
+        return sorted(self.generics, key=lambda generic: price_key(generic.parsed_price))
+
+    def to_row(self, generic_slots=MAX_GENERICS):
+        row = [self.name, self.composition, self.date_added]
+        for generic in self.generics:
+            row.extend(generic.to_cells())
+        slots = max(generic_slots, len(self.generics))
+        return row + [""] * ((slots - len(self.generics)) * GENERIC_WIDTH)
+
+    def __repr__(self):
+        return f"Medicine({self.name!r}, {len(self.generics)} generics)"
@@ -0,0 +1,234 @@
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left, bisect_right
+
+from metrics import timed
+
+# Binary sidecar mirroring the workbook, so startup and lookups skip the XLSX parse.
+#
+#   header   magic, record count, mirrored workbook mtime_ns and size, index offset
+#   data     strings (u32 length + UTF-8) and records, interleaved and append-only
+#   index    record offsets in insertion order, then the same offsets sorted by name
+#
+# A record is three string offsets (name, composition, date added), a generic
+# group count, and four string offsets per group. Offset 0 is an empty cell.
+MAGIC = b"MEDPACK1"
+HEADER = struct.Struct("<8sIqqQ")
+STRING = struct.Struct("<I")
+RECORD = struct.Struct("<QQQH")
+OFFSET_SIZE = array('Q').itemsize
+GROUP_WIDTH = 4
+
+
+def _key(name):
+    return str(name).strip().casefold()
+
+
+def _offsets(data):
+    offsets = array('Q', data)
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    return offsets
+
+
+def _to_bytes(offsets):
+    if sys.byteorder != "little":
+        offsets = array('Q', offsets)
+        offsets.byteswap()
+    return offsets.tobytes()
+
+
+class PackedSnapshot:
+    @timed("packed.open")
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, mtime_ns, size, self.index_offset = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a packed catalogue")
+        self.stamp = [mtime_ns, size]
+        # The offset arrays are copied out so an incremental write can reuse their space.
+        width = self.count * OFFSET_SIZE
+        self.order = _offsets(self.map[self.index_offset:self.index_offset + width])
+        self.sorted = _offsets(self.map[self.index_offset + width:self.index_offset + 2 * width])
+        self.strings = {}
+
+    def __len__(self):
+        return self.count
+
+    def string(self, offset):
+        if not offset:
+            return None
+        text = self.strings.get(offset)
+        if text is None:
+            length = STRING.unpack_from(self.map, offset)[0]
+            start = offset + STRING.size
+            text = self.strings[offset] = self.map[start:start + length].decode("utf-8")
+        return text
+
+    def name_key(self, offset):
+        return _key(self.string(RECORD.unpack_from(self.map, offset)[0]) or "")
+
+    def record(self, offset):
+        name, composition, date_added, groups = RECORD.unpack_from(self.map, offset)
+        start = offset + RECORD.size
+        cells = _offsets(self.map[start:start + groups * GROUP_WIDTH * OFFSET_SIZE])
+        return (self.string(name), self.string(composition), self.string(date_added)) + tuple(
+            self.string(cell) for cell in cells
+        )
+
+    def rows(self, start=0):
+        for offset in self.order[start:]:
+            yield self.record(offset)
+
+    def find(self, name):
+        key = _key(name)
+        position = bisect_left(self.sorted, key, key=self.name_key)
+        if position < self.count and self.name_key(self.sorted[position]) == key:
+            return self.record(self.sorted[position])
+        return None
+
+    def close(self):
+        self.map.close()
+
+
+class PackedWriter:
+    def __init__(self, f, position):
+        self.f = f
+        self.position = position
+        self.strings = {}
+
+    def _write(self, data):
+        offset = self.position
+        self.f.write(data)
+        self.position += len(data)
+        return offset
+
+    def string(self, value):
+        if value is None:
+            return 0
+        text = str(value)
+        offset = self.strings.get(text)
+        if offset is None:
+            data = text.encode("utf-8")
+            offset = self.strings[text] = self._write(STRING.pack(len(data)) + data)
+        return offset
+
+    def record(self, row):
+        row = list(row) + [None] * (3 - len(row))
+        groups = -(-(len(row) - 3) // GROUP_WIDTH)
+        row += [None] * (3 + groups * GROUP_WIDTH - len(row))
+        offsets = [self.string(cell) for cell in row]
+        return self._write(RECORD.pack(*offsets[:3], groups) + _to_bytes(array('Q', offsets[3:])))
+
+    def index(self, order, by_name):
+        index_offset = self.position
+        self._write(_to_bytes(order))
+        self._write(_to_bytes(by_name))
+        return index_offset
+
+
+class PackedBuilder:
+    # Writes a fresh sidecar while the workbook is being streamed for other reasons.
+    def __init__(self, catalogue):
+        self.catalogue = catalogue
+        self.stamp = catalogue.source_stamp()
+        directory = os.path.dirname(os.path.abspath(catalogue.path))
+        fd, self.tmp_path = tempfile.mkstemp(prefix=os.path.basename(catalogue.path), dir=directory)
+        self.f = os.fdopen(fd, "wb")
+        self.f.write(bytes(HEADER.size))
+        self.writer = PackedWriter(self.f, HEADER.size)
+        self.order = array('Q')
+        self.keys = []
+
+    def add(self, row):
+        offset = self.writer.record(row)
+        self.keys.append(_key(row[0] if row and row[0] is not None else ""))
+        self.order.append(offset)
+
+    def finish(self):
+        # Only publish if the workbook did not change while it was being read.
+        if self.catalogue.source_stamp() != self.stamp:
+            return self.abort()
+        by_name = array('Q', (self.order[i] for i in sorted(range(len(self.order)), key=self.keys.__getitem__)))
+        index_offset = self.writer.index(self.order, by_name)
+        self.f.seek(0)
+        self.f.write(HEADER.pack(MAGIC, len(self.order), *self.stamp, index_offset))
+        self.f.close()
+        try:
+            os.replace(self.tmp_path, self.catalogue.path)
+        except OSError:
+            # Windows refuses to replace a file that is still mapped; the next build retries.
+            return self.abort()
+        self.catalogue.forget()
+        return True
+
+    def abort(self):
+        self.f.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+        return False
+
+
+class PackedCatalogue:
+    def __init__(self, source_path):
+        self.source_path = source_path
+        self.path = source_path + ".bin"
+        self._snapshot = None
+        self._snapshot_stamp = None
+
+    def source_stamp(self):
+        st = os.stat(self.source_path)
+        return [st.st_mtime_ns, st.st_size]
+
+    def _own_stamp(self):
+        st = os.stat(self.path)
+        return (st.st_mtime_ns, st.st_size)
+
+    def load(self):
+        # Returns a snapshot only while it still mirrors the workbook on disk.
+        try:
+            own_stamp = self._own_stamp()
+            if self._snapshot is None or self._snapshot_stamp != own_stamp:
+                self._snapshot, self._snapshot_stamp = PackedSnapshot(self.path), own_stamp
+            if self._snapshot.stamp == self.source_stamp():
+                return self._snapshot
+        except (OSError, ValueError, struct.error):
+            self.forget()
+        return None
+
+    def builder(self):
+        return PackedBuilder(self)
+
+    @timed("packed.append")
+    def append(self, snapshot, rows):
+        # Appends records after the existing data and rewrites only the offset index and header.
+        with open(self.path, "r+b") as f:
+            f.seek(snapshot.index_offset)
+            writer = PackedWriter(f, snapshot.index_offset)
+            added = [(_key(row[0] if row and row[0] is not None else ""), writer.record(row)) for row in rows]
+            order = snapshot.order + array('Q', (offset for _, offset in added))
+            by_name = array('Q')
+            previous = 0
+            for key, offset in sorted(added, key=lambda item: item[0]):
+                position = bisect_right(snapshot.sorted, key, lo=previous, key=snapshot.name_key)
+                by_name.extend(snapshot.sorted[previous:position])
+                by_name.append(offset)
+                previous = position
+            by_name.extend(snapshot.sorted[previous:])
+            index_offset = writer.index(order, by_name)
+            f.flush()
+            os.fsync(f.fileno())
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, len(order), *self.source_stamp(), index_offset))
+            f.flush()
+            os.fsync(f.fileno())
+        self.forget()
+
+    def forget(self):
+        # Old snapshots stay mapped for readers still iterating them and are closed with them.
+        self._snapshot = self._snapshot_stamp = None
@@ -1,13 +1,28 @@
+import time
+IMPORT_STARTED = time.perf_counter()
+
+import argparse
 import tkinter as tk
-from tkinter import ttk, messagebox
-from openpyxl import Workbook, load_workbook
+from tkinter import ttk, messagebox, filedialog, font as tkfont
 import os
-import subprocess
-import platform
 from datetime import datetime
+from core import MedicineService
+from metrics import METRICS, timed
+from models import Generic, Medicine
+from storage import SqliteStorage
+from widgets import PagedSource, VirtualList
+from workers import TkExecutor
 
 FILE_NAME = "med2.xlsx"
-MAX_GENERICS = 5
+STORE_PATH = os.environ.get("MEDICINE_STORE", FILE_NAME)
+COMPACT_INTERVAL_MS = 60_000
+REFRESH_INTERVAL_MS = 5_000
+SUGGEST_DELAY_MS = 200
+RECENT_COUNT = 5
+DEBUG_REFRESH_MS = 1_000
+GENERIC_TITLE_FONT = ('Segoe UI', 12, 'bold')
+GENERIC_TEXT_FONT = ('Segoe UI', 10)
+GENERIC_PADX = 10
 
 COLORS = {
     'primary': '#2E86AB',
@@ -64,36 +79,165 @@ class ModernButton:
     def grid(self, **kwargs):
         self.button.grid(**kwargs)
 
-def initialize_excel():
-    if not os.path.exists(FILE_NAME):
-        wb = Workbook()
-        ws = wb.active
-        ws.append([
-            "Medicine Name", "Composition", "Date Added",
-            "Generic 1 Name", "Generic 1 Composition", "Generic 1 Price", "Generic 1 Side Effects",
-            "Generic 2 Name", "Generic 2 Composition", "Generic 2 Price", "Generic 2 Side Effects",
-            "Generic 3 Name", "Generic 3 Composition", "Generic 3 Price", "Generic 3 Side Effects",
-            "Generic 4 Name", "Generic 4 Composition", "Generic 4 Price", "Generic 4 Side Effects",
-            "Generic 5 Name", "Generic 5 Composition", "Generic 5 Price", "Generic 5 Side Effects"
-        ])
-        wb.save(FILE_NAME)
+def make_medicine_row(parent):
+    frame = tk.Frame(parent, bg='#F8F9FA', relief='raised', bd=1)
+    frame.title = tk.Label(frame, text="", font=('Segoe UI', 12, 'bold'), fg=COLORS['text_dark'], bg='#F8F9FA', anchor='w')
+    frame.title.pack(fill='x', padx=10, pady=(5,0))
+    frame.detail = tk.Label(frame, text="", font=('Segoe UI', 10), fg=COLORS['text_light'], bg='#F8F9FA', anchor='w')
+    frame.detail.pack(fill='x', padx=10, pady=(0,5))
+    return frame
+
+def fill_medicine_row(frame, medicine):
+    frame.medicine = medicine
+    if medicine is None:
+        frame.title.config(text="")
+        frame.detail.config(text="")
+        return
+    composition = medicine.composition
+    frame.title.config(text=f"📝 {medicine.name}")
+    frame.detail.config(text=f"Composition: {composition[:50]}..." if len(composition) > 50 else f"Composition: {composition}")
+
+def make_generic_row(parent):
+    frame = tk.Frame(parent, bg='#E8F4FD', relief='raised', bd=1)
+    frame.labels = [
+        tk.Label(frame, font=GENERIC_TITLE_FONT, fg=COLORS['primary'], bg='#E8F4FD'),
+        tk.Label(frame, font=GENERIC_TEXT_FONT, fg=COLORS['text_dark'], bg='#E8F4FD', justify='left'),
+        tk.Label(frame, font=GENERIC_TEXT_FONT, fg=COLORS['success'], bg='#E8F4FD', justify='left'),
+        tk.Label(frame, font=GENERIC_TEXT_FONT, fg=COLORS['secondary'], bg='#E8F4FD', justify='left')
+    ]
+    for row, label in enumerate(frame.labels):
+        label.grid(row=row, column=0, sticky='w', padx=GENERIC_PADX, pady=((10,5) if row == 0 else 0))
+    # Long compositions and side effects wrap to the row width instead of running off the edge.
+    frame.bind('<Configure>', lambda e: [label.config(wraplength=max(1, e.width - 2 * GENERIC_PADX)) for label in frame.labels[1:]])
+    return frame
+
+def generic_lines(generic):
+    return [
+        f"Composition: {generic.composition or 'Not specified'}",
+        f"💰 Price: {generic.price or 'Not specified'}",
+        f"⚠️ Side Effects: {generic.side_effects or 'Not specified'}",
+    ]
+
+def fill_generic_row(frame, item):
+    i, generic = item
+    frame.labels[0].config(text=f"#{i}: {generic.name}")
+    for label, text in zip(frame.labels[1:], generic_lines(generic)):
+        label.config(text=text)
+
+def generic_row_height(generics, width):
+    # Tall enough for the generic whose text wraps onto the most lines at this width.
+    title, body = tkfont.Font(font=GENERIC_TITLE_FONT), tkfont.Font(font=GENERIC_TEXT_FONT)
+    wrap = max(1, width - 2 * GENERIC_PADX)
+    lines = max(sum(max(1, -(-body.measure(text) // wrap)) for text in generic_lines(generic)) for _, generic in generics)
+    return title.metrics('linespace') + lines * body.metrics('linespace') + 30
+
+def prepare_database_file(service):
+    # Runs on a worker: compaction waits for the service lock and the export reads the whole store.
+    service.compact()
+    path = service.store.file_name
+    if isinstance(service.store, SqliteStorage):
+        # Exported next to the database, never over a workbook the user keeps.
+        path += ".xlsx"
+        service.store.export_xlsx(path)
+    return path
 
-def view_database():
+def open_file(path):
+    import platform
+    import subprocess
+    
     try:
         if platform.system() == "Windows":
-            os.startfile(FILE_NAME)
+            os.startfile(path)
         elif platform.system() == "Darwin":
-            subprocess.call(["open", FILE_NAME])
+            subprocess.Popen(["open", path])
         else:
-            subprocess.call(["xdg-open", FILE_NAME])
+            subprocess.Popen(["xdg-open", path])
     except Exception as e:
         messagebox.showerror("Error", f"Error opening file: {str(e)}")
 
 class MedicineApp:
-    def __init__(self):
+    def __init__(self, service):
+        self.service = service
         self.root = tk.Tk()
+        self.suggest_job = None
+        self.suggestion_names = []
+        self.recent_items = []
+        self.browse_views = []
+        self.executor = TkExecutor(self.root, on_busy=self.show_busy, on_callback_error=self.show_error)
+        self.on_ready = None
         self.setup_main_window()
         self.create_main_interface()
+        # Nothing is read from the store until the window is on screen.
+        self.root.bind('<Map>', self.window_mapped)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.bind('<F12>', lambda e: self.show_debug_panel())
+        self.root.after(COMPACT_INTERVAL_MS, self.compact_store)
+        self.root.after(REFRESH_INTERVAL_MS, self.check_for_changes)
+        
+    def window_mapped(self, event):
+        if event.widget is not self.root:
+            return
+        self.root.unbind('<Map>')
+        self.root.after_idle(self.window_shown)
+    
+    def window_shown(self):
+        METRICS.observe("startup.first_paint", (time.perf_counter() - IMPORT_STARTED) * 1e3)
+        self.search_status.config(text="⏳ Loading catalogue...", fg=COLORS['text_light'])
+        self.load_recent_medicines()
+        self.executor.submit(self.service.load, on_done=self.catalogue_loaded, on_error=self.show_error, cancellable=False)
+    
+    def catalogue_loaded(self, service):
+        METRICS.observe("startup.ready", (time.perf_counter() - IMPORT_STARTED) * 1e3)
+        if self.search_status.cget('text') == "⏳ Loading catalogue...":
+            self.search_status.config(text=f"✅ {service.count()} medicines ready", fg='green')
+        if self.on_ready:
+            self.on_ready()
+    
+    def view_database(self):
+        self.search_status.config(text="📊 Preparing the database file...", fg=COLORS['text_light'])
+        self.executor.submit(prepare_database_file, self.service, on_done=self.database_ready, on_error=self.database_failed, cancellable=False)
+    
+    def database_ready(self, path):
+        self.search_status.config(text="")
+        open_file(path)
+    
+    def database_failed(self, error):
+        self.search_status.config(text="")
+        messagebox.showerror("Error", f"Error opening file: {str(error)}")
+    
+    def show_error(self, error):
+        self.search_status.config(text=f"❌ Error: {str(error)}", fg='red')
+    
+    def show_busy(self, count):
+        if count:
+            self.busy_label.config(text=f"⏳ Working on {count} task{'s' if count > 1 else ''}...")
+            self.busy_frame.pack(pady=(0, 10))
+            self.busy_bar.start(10)
+        else:
+            self.busy_bar.stop()
+            self.busy_frame.pack_forget()
+    
+    def compact_store(self):
+        self.executor.submit(self.service.compact, on_error=self.show_error, cancellable=False, show_busy=False)
+        self.root.after(COMPACT_INTERVAL_MS, self.compact_store)
+    
+    def check_for_changes(self):
+        self.executor.submit(self.service.refresh_if_stale, on_done=self.changes_checked, on_error=self.changes_checked, cancellable=False, show_busy=False)
+    
+    def changes_checked(self, changed):
+        # Rescheduled only once the check finishes, so slow reloads never overlap.
+        self.root.after(REFRESH_INTERVAL_MS, self.check_for_changes)
+        if changed is True:
+            self.refresh_recent()
+    
+    def on_close(self):
+        try:
+            self.executor.shutdown()
+            self.service.close()
+        except Exception as e:
+            if not messagebox.askyesno("Error", f"Could not save pending medicines: {str(e)}\n\nExit anyway?"):
+                return
+        self.root.destroy()
         
     def setup_main_window(self):
         self.root.title("💊 Medicine Management System")
@@ -144,18 +288,35 @@ class MedicineApp:
         )
         self.search_entry.pack(side='left', padx=(0, 10))
         self.search_entry.bind('<Return>', lambda e: self.search_medicine())
+        self.search_entry.bind('<Down>', self.focus_suggestions)
+        self.search_entry.bind('<Escape>', lambda e: self.hide_suggestions())
+        self.search_var.trace_add('write', self.schedule_suggestions)
         
         ModernButton(search_frame, "🔍 Search", self.search_medicine, COLORS['primary'], width=12).pack(side='left')
         
         self.search_status = tk.Label(search_card, text="", font=('Segoe UI', 10), bg=COLORS['card'])
         self.search_status.pack(pady=(0, 15))
         
+        self.suggestions = tk.Listbox(search_card, font=('Segoe UI', 11), height=6, width=60, relief='flat', bd=1, activestyle='none', selectbackground=COLORS['primary'])
+        self.suggestions.bind('<Double-Button-1>', self.pick_suggestion)
+        self.suggestions.bind('<Return>', self.pick_suggestion)
+        self.suggestions.bind('<Escape>', lambda e: self.hide_suggestions())
+        
+        self.busy_frame = tk.Frame(search_card, bg=COLORS['card'])
+        self.busy_label = tk.Label(self.busy_frame, text="", font=('Segoe UI', 10), fg=COLORS['text_light'], bg=COLORS['card'])
+        self.busy_label.pack(side='left', padx=(0, 10))
+        self.busy_bar = ttk.Progressbar(self.busy_frame, mode='indeterminate', length=150)
+        self.busy_bar.pack(side='left', padx=(0, 10))
+        tk.Button(self.busy_frame, text="✖ Cancel", bg=COLORS['text_light'], fg='white', relief='flat', command=self.executor.cancel_all).pack(side='left')
+        
         action_frame = tk.Frame(main_frame, bg=COLORS['background'])
         action_frame.pack(fill='x', pady=10)
         
         ModernButton(action_frame, "➕ Add New Medicine", self.open_medicine_ui, COLORS['success'], width=18).pack(side='left', padx=(0, 10))
-        ModernButton(action_frame, "📊 View Database", view_database, COLORS['secondary'], width=18).pack(side='left', padx=(0, 10))
-        ModernButton(action_frame, "📈 Statistics", self.show_statistics, COLORS['accent'], width=18).pack(side='left')
+        ModernButton(action_frame, "📊 View Database", self.view_database, COLORS['secondary'], width=18).pack(side='left', padx=(0, 10))
+        ModernButton(action_frame, "📈 Statistics", self.show_statistics, COLORS['accent'], width=18).pack(side='left', padx=(0, 10))
+        ModernButton(action_frame, "📥 Bulk Import", self.bulk_import, COLORS['primary'], width=18).pack(side='left', padx=(0, 10))
+        ModernButton(action_frame, "📚 Browse All", self.browse_medicines, COLORS['success'], width=14).pack(side='left')
         
         self.create_recent_section(main_frame)
         
@@ -171,40 +332,35 @@ class MedicineApp:
             bg=COLORS['card']
         ).pack(pady=(15, 10))
         
-        canvas = tk.Canvas(recent_card, bg=COLORS['card'], height=200)
-        scrollbar = ttk.Scrollbar(recent_card, orient='vertical', command=canvas.yview)
-        self.recent_frame = tk.Frame(canvas, bg=COLORS['card'])
-        self.recent_frame.bind('<Configure>', lambda e: canvas.configure(scrollregion=canvas.bbox('all')))
-        
-        canvas.create_window((0, 0), window=self.recent_frame, anchor='nw')
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        canvas.pack(side='left', fill='both', expand=True, padx=15, pady=(0, 15))
-        scrollbar.pack(side='right', fill='y', pady=(0, 15))
-        
-        self.load_recent_medicines()
+        self.recent_message = tk.Label(recent_card, text="", font=('Segoe UI', 11), fg=COLORS['text_light'], bg=COLORS['card'])
+        self.recent_list = VirtualList(recent_card, 56, self.make_clickable_row, fill_medicine_row, COLORS['card'], height=200)
+        self.recent_list.pack(fill='both', expand=True, padx=15, pady=(0, 15))
         
+    def make_clickable_row(self, parent):
+        frame = make_medicine_row(parent)
+        for widget in (frame, frame.title, frame.detail):
+            widget.bind('<Button-1>', lambda e, f=frame: f.medicine and self.display_medicine(f.medicine))
+        return frame
+    
     def load_recent_medicines(self):
-        try:
-            wb = load_workbook(FILE_NAME)
-            ws = wb.active
-            rows = list(ws.iter_rows(min_row=2, values_only=True))
-            
-            if not rows:
-                tk.Label(self.recent_frame, text="No medicines added yet.", font=('Segoe UI', 11), fg=COLORS['text_light'], bg=COLORS['card']).pack(pady=20)
-                wb.close()
-                return
-            
-            for row in reversed(rows[-5:]):
-                frame = tk.Frame(self.recent_frame, bg='#F8F9FA', relief='raised', bd=1)
-                frame.pack(fill='x', pady=2, padx=5)
-                
-                tk.Label(frame, text=f"📝 {row[0]}", font=('Segoe UI', 12, 'bold'), fg=COLORS['text_dark'], bg='#F8F9FA').pack(anchor='w', padx=10, pady=(5,0))
-                tk.Label(frame, text=f"Composition: {row[1][:50]}..." if len(str(row[1])) > 50 else f"Composition: {row[1]}", font=('Segoe UI', 10), fg=COLORS['text_light'], bg='#F8F9FA').pack(anchor='w', padx=10, pady=(0,5))
-            
-            wb.close()
-        except Exception as e:
-            tk.Label(self.recent_frame, text="Error loading recent medicines", font=('Segoe UI', 11), fg='red', bg=COLORS['card']).pack(pady=20)
+        self.executor.submit(self.service.recent, RECENT_COUNT, on_done=self.render_recent, on_error=self.recent_failed)
+    
+    def render_recent(self, medicines):
+        self.recent_items = list(reversed(medicines))
+        self.show_recent()
+    
+    @timed("ui.recent")
+    def show_recent(self):
+        if self.recent_items:
+            self.recent_message.pack_forget()
+        else:
+            self.recent_message.config(text="No medicines added yet.", fg=COLORS['text_light'])
+            self.recent_message.pack(pady=20, before=self.recent_list)
+        self.recent_list.set_source(len(self.recent_items), self.recent_items.__getitem__)
+    
+    def recent_failed(self, error):
+        self.recent_message.config(text="Error loading recent medicines", fg='red')
+        self.recent_message.pack(pady=20, before=self.recent_list)
     
     def search_medicine(self):
         search_name = self.search_var.get().strip()
@@ -212,24 +368,78 @@ class MedicineApp:
             self.search_status.config(text="⚠️ Please enter a medicine name!", fg='red')
             return
         
+        if not self.service.ready:
+            # Index still building: look the name up in the store off the UI thread.
+            self.search_status.config(text="🔍 Searching...", fg=COLORS['text_light'])
+            self.executor.submit(self.service.get, search_name, on_done=self.show_search_result, on_error=self.show_error)
+            return
+        self.show_search_result(self.service.get(search_name))
+    
+    def show_search_result(self, medicine):
         try:
-            wb = load_workbook(FILE_NAME)
-            ws = wb.active
-            for row in ws.iter_rows(min_row=2, values_only=True):
-                if row[0] and row[0].lower() == search_name.lower():
-                    wb.close()
-                    self.display_medicine(row)
-                    self.search_status.config(text="✅ Medicine found!", fg='green')
-                    return
-            wb.close()
+            if medicine:
+                self.hide_suggestions()
+                self.display_medicine(medicine)
+                self.search_status.config(text="✅ Medicine found!", fg='green')
+                return
+            if self.show_suggestions(self.service.suggest(self.search_var.get())):
+                self.search_status.config(text="❌ Medicine not found. Did you mean one of these?", fg='orange')
+                return
             self.search_status.config(text="❌ Medicine not found. Opening add form...", fg='orange')
             self.root.after(1000, self.open_medicine_ui)
         except Exception as e:
-            self.search_status.config(text=f"❌ Error: {str(e)}", fg='red')
+            self.show_error(e)
+    
+    def schedule_suggestions(self, *args):
+        if self.suggest_job:
+            self.root.after_cancel(self.suggest_job)
+        self.suggest_job = self.root.after(SUGGEST_DELAY_MS, self.update_suggestions)
+    
+    def update_suggestions(self):
+        self.suggest_job = None
+        query = self.search_var.get().strip()
+        if not self.service.ready or len(query) < 2:
+            self.hide_suggestions()
+            return
+        self.show_suggestions(self.service.suggest(query, limit=8))
+    
+    def show_suggestions(self, results):
+        self.suggestions.delete(0, 'end')
+        self.suggestion_names = [r.medicine for r in results]
+        for r in results:
+            self.suggestions.insert('end', r.medicine if r.field == 'name' else f"{r.medicine}   ({r.field}: {r.matched})")
+        if not results:
+            self.hide_suggestions()
+            return False
+        self.suggestions.config(height=min(len(results), 8))
+        self.suggestions.pack(before=self.search_status, pady=(0, 10))
+        return True
+    
+    def hide_suggestions(self):
+        self.suggestions.pack_forget()
     
-    def display_medicine(self, data):
+    def focus_suggestions(self, event):
+        if self.suggestion_names:
+            self.suggestions.focus_set()
+            self.suggestions.selection_set(0)
+            self.suggestions.activate(0)
+    
+    def pick_suggestion(self, event):
+        selection = self.suggestions.curselection()
+        if not selection:
+            return
+        self.search_var.set(self.suggestion_names[selection[0]])
+        if self.suggest_job:
+            self.root.after_cancel(self.suggest_job)
+            self.suggest_job = None
+        self.hide_suggestions()
+        self.search_entry.focus_set()
+        self.search_medicine()
+    
+    @timed("ui.detail")
+    def display_medicine(self, medicine):
         window = tk.Toplevel(self.root)
-        window.title(f"💊 {data[0]} - Details")
+        window.title(f"💊 {medicine.name} - Details")
         window.geometry("900x700")
         window.configure(bg=COLORS['background'])
         window.transient(self.root)
@@ -238,7 +448,7 @@ class MedicineApp:
         header_frame = tk.Frame(window, bg=COLORS['primary'], height=60)
         header_frame.pack(fill='x')
         header_frame.pack_propagate(False)
-        tk.Label(header_frame, text=f"💊 {data[0]}", font=('Segoe UI', 20, 'bold'), fg='white', bg=COLORS['primary']).pack(expand=True)
+        tk.Label(header_frame, text=f"💊 {medicine.name}", font=('Segoe UI', 20, 'bold'), fg='white', bg=COLORS['primary']).pack(expand=True)
         
         content_frame = tk.Frame(window, bg=COLORS['background'])
         content_frame.pack(fill='both', expand=True, padx=20, pady=20)
@@ -246,75 +456,111 @@ class MedicineApp:
         info_card = tk.Frame(content_frame, bg=COLORS['card'], relief='raised', bd=2)
         info_card.pack(fill='x', pady=(0,15))
         tk.Label(info_card, text="Medicine Information", font=('Segoe UI', 16, 'bold'), fg=COLORS['text_dark'], bg=COLORS['card']).pack(pady=(15,10))
-        tk.Label(info_card, text=f"Composition: {data[1]}", font=('Segoe UI', 12), fg=COLORS['text_dark'], bg=COLORS['card'], wraplength=800).pack(pady=(0,15), padx=20)
+        tk.Label(info_card, text=f"Composition: {medicine.composition}", font=('Segoe UI', 12), fg=COLORS['text_dark'], bg=COLORS['card'], wraplength=800).pack(pady=(0,15), padx=20)
+        
+        detail = self.service.detail(medicine)
+        if detail.cheapest:
+            offers = ", ".join(f"{p.name} {p.price}" + ("" if p.medicine == medicine.name else f" (under {p.medicine})") for p in detail.cheapest)
+            tk.Label(info_card, text=f"💡 Cheapest same-composition generics: {offers}", font=('Segoe UI', 11, 'bold'), fg=COLORS['success'], bg=COLORS['card'], wraplength=800).pack(pady=(0,15), padx=20)
         
         generics_card = tk.Frame(content_frame, bg=COLORS['card'], relief='raised', bd=2)
         generics_card.pack(fill='both', expand=True)
-        tk.Label(generics_card, text="💊 Generic Alternatives", font=('Segoe UI', 16, 'bold'), fg=COLORS['text_dark'], bg=COLORS['card']).pack(pady=(15,10))
+        tk.Label(generics_card, text="💊 Generic Alternatives (cheapest first)", font=('Segoe UI', 16, 'bold'), fg=COLORS['text_dark'], bg=COLORS['card']).pack(pady=(15,10))
         
-        canvas = tk.Canvas(generics_card, bg=COLORS['card'])
-        scrollbar = ttk.Scrollbar(generics_card, orient='vertical', command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas, bg=COLORS['card'])
-        scrollable_frame.bind('<Configure>', lambda e: canvas.configure(scrollregion=canvas.bbox('all')))
-        canvas.create_window((0,0), window=scrollable_frame, anchor='nw')
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        generics_found = False
+        if not medicine.generics:
+            tk.Label(generics_card, text="No generic alternatives found.", font=('Segoe UI', 12), fg=COLORS['text_light'], bg=COLORS['card']).pack(pady=20)
+            return
         
-        for i in range(MAX_GENERICS):
-            name_idx = 3 + (i * 4)
-            comp_idx = 4 + (i * 4)
-            price_idx = 5 + (i * 4)
-            side_idx = 6 + (i * 4)
-            
-            if name_idx < len(data) and data[name_idx] and str(data[name_idx]).strip():
-                generics_found = True
-                generic_frame = tk.Frame(scrollable_frame, bg='#E8F4FD', relief='raised', bd=1)
-                generic_frame.pack(fill='x', padx=15, pady=5)
-                
-                tk.Label(generic_frame, text=f"Generic {i+1}: {data[name_idx]}", font=('Segoe UI', 12, 'bold'), fg=COLORS['primary'], bg='#E8F4FD').grid(row=0,column=0, sticky='w', padx=10,pady=(10,5))
-                
-                comp_text = data[comp_idx] if comp_idx < len(data) and data[comp_idx] else "Not specified"
-                tk.Label(generic_frame, text=f"Composition: {comp_text}", font=('Segoe UI',10), fg=COLORS['text_dark'], bg='#E8F4FD').grid(row=1,column=0, sticky='w', padx=10)
-                
-                price_text = data[price_idx] if price_idx < len(data) and data[price_idx] else "Not specified"
-                tk.Label(generic_frame, text=f"💰 Price: {price_text}", font=('Segoe UI',10), fg=COLORS['success'], bg='#E8F4FD').grid(row=2,column=0, sticky='w', padx=10)
-                
-                side_text = data[side_idx] if side_idx < len(data) and data[side_idx] else "Not specified"
-                tk.Label(generic_frame, text=f"⚠️ Side Effects: {side_text}", font=('Segoe UI',10), fg=COLORS['secondary'], bg='#E8F4FD', wraplength=800).grid(row=3,column=0, sticky='w', padx=10,pady=(0,10))
-        
-        if not generics_found:
-            tk.Label(scrollable_frame, text="No generic alternatives found.", font=('Segoe UI', 12), fg=COLORS['text_light'], bg=COLORS['card']).pack(pady=20)
-        
-        canvas.pack(side='left', fill='both', expand=True, padx=(15,0), pady=(0,15))
-        scrollbar.pack(side='right', fill='y', pady=(0,15), padx=(0,15))
+        generics = list(enumerate(detail.ranked_generics, start=1))
+        generics_list = VirtualList(generics_card, 110, make_generic_row, fill_generic_row, COLORS['card'])
+        generics_list.pack(fill='both', expand=True, padx=15, pady=(0,15))
+        generics_list.body.bind('<Configure>', lambda e: generics_list.set_row_height(generic_row_height(generics, e.width)), add='+')
+        generics_list.set_source(len(generics), generics.__getitem__)
     
     def open_medicine_ui(self):
-        MedicineFormWindow(self.root, self.refresh_recent)
+        MedicineFormWindow(self.root, self.medicine_saved, self.executor, self.service.add)
+    
+    def medicine_saved(self, medicine):
+        # Only the visible rows are re-filled; no widgets are rebuilt and the store is not re-read.
+        self.recent_items = ([medicine] + self.recent_items)[:RECENT_COUNT]
+        self.show_recent()
+        self.refresh_browse_views(self.service.browse_position(medicine.name))
+    
+    @timed("ui.browse")
+    def browse_medicines(self):
+        if not self.service.ready:
+            self.search_status.config(text="⏳ Still loading the catalogue, try again in a moment.", fg='orange')
+            return
+        window = tk.Toplevel(self.root)
+        window.title("📚 All Medicines")
+        window.geometry("700x650")
+        window.configure(bg=COLORS['background'])
+        window.transient(self.root)
+        
+        header_frame = tk.Frame(window, bg=COLORS['success'], height=60)
+        header_frame.pack(fill='x')
+        header_frame.pack_propagate(False)
+        count_label = tk.Label(header_frame, text="", font=('Segoe UI', 18, 'bold'), fg='white', bg=COLORS['success'])
+        count_label.pack(expand=True)
+        
+        source = PagedSource(self.service.browse)
+        view = VirtualList(window, 56, self.make_clickable_row, fill_medicine_row, COLORS['card'])
+        view.pack(fill='both', expand=True, padx=20, pady=20)
+        view.count_label = count_label
+        view.source = source
+        self.browse_views.append(view)
+        window.bind('<Destroy>', lambda e: view in self.browse_views and e.widget is window and self.browse_views.remove(view))
+        self.refresh_browse_views()
+    
+    def refresh_browse_views(self, inserted_at=None):
+        # After a single save only the pages from its position onwards have shifted.
+        count = self.service.count()
+        for view in self.browse_views:
+            if inserted_at is not None and count == view.count:
+                continue
+            view.source.invalidate(inserted_at or 0)
+            view.count_label.config(text=f"📚 {count} Medicines")
+            view.set_source(count, view.source)
+    
+    def bulk_import(self):
+        path = filedialog.askopenfilename(
+            parent=self.root,
+            title="Import supplier catalogue",
+            filetypes=[("Catalogues", "*.csv *.xlsx"), ("CSV", "*.csv"), ("Excel", "*.xlsx")]
+        )
+        if not path:
+            return
+        self.search_status.config(text=f"📥 Importing {os.path.basename(path)}...", fg=COLORS['text_light'])
+        self.executor.submit(self.service.bulk_import, path, on_done=self.bulk_import_done, on_error=self.show_error, cancellable=False)
+    
+    def bulk_import_done(self, report):
+        self.search_status.config(text=f"✅ {report.summary()}", fg='green')
+        details = "\n".join(f"Line {line_no}: {reason}" for line_no, reason, _ in report.rejected[:15])
+        if len(report.rejected) > 15:
+            details += f"\n... and {len(report.rejected) - 15} more"
+        messagebox.showinfo("Bulk Import", report.summary() + (f"\n\nRejected rows:\n{details}" if details else ""))
+        if report.imported:
+            self.refresh_recent()
     
     def refresh_recent(self):
-        for widget in self.recent_frame.winfo_children():
-            widget.destroy()
         self.load_recent_medicines()
+        self.refresh_browse_views()
     
     def show_statistics(self):
+        if self.service.ready:
+            self.show_statistics_window(self.service.stats())
+            return
+        self.executor.submit(self.service.stats, on_done=self.show_statistics_window, on_error=self.statistics_failed)
+    
+    def statistics_failed(self, error):
+        messagebox.showerror("Error", f"Error loading statistics: {str(error)}")
+    
+    @timed("ui.statistics")
+    def show_statistics_window(self, stats):
         try:
-            wb = load_workbook(FILE_NAME)
-            ws = wb.active
-            rows = list(ws.iter_rows(min_row=2, values_only=True))
-            
-            total_medicines = len(rows)
-            total_generics = 0
-            for row in rows:
-                for i in range(MAX_GENERICS):
-                    name_idx = 3 + (i * 4)
-                    if name_idx < len(row) and row[name_idx] and str(row[name_idx]).strip():
-                        total_generics += 1
-            wb.close()
-            
             stats_window = tk.Toplevel(self.root)
             stats_window.title("📈 Database Statistics")
-            stats_window.geometry("400x300")
+            stats_window.geometry("450x480")
             stats_window.configure(bg=COLORS['background'])
             stats_window.transient(self.root)
             stats_window.grab_set()
@@ -323,21 +569,77 @@ class MedicineApp:
             stats_frame = tk.Frame(stats_window, bg=COLORS['card'], relief='raised', bd=2)
             stats_frame.pack(fill='both', expand=True, padx=20, pady=(0,20))
             
-            tk.Label(stats_frame, text=f"Total Medicines: {total_medicines}", font=('Segoe UI',14), fg=COLORS['text_dark'], bg=COLORS['card']).pack(pady=15)
-            tk.Label(stats_frame, text=f"Total Generic Alternatives: {total_generics}", font=('Segoe UI',14), fg=COLORS['text_dark'], bg=COLORS['card']).pack(pady=15)
-            avg_generics = round(total_generics/total_medicines,2) if total_medicines>0 else 0
-            tk.Label(stats_frame, text=f"Average Generics per Medicine: {avg_generics}", font=('Segoe UI',14), fg=COLORS['text_dark'], bg=COLORS['card']).pack(pady=15)
+            tk.Label(stats_frame, text=f"Total Medicines: {stats['total_medicines']}", font=('Segoe UI',14), fg=COLORS['text_dark'], bg=COLORS['card']).pack(pady=(15,8))
+            tk.Label(stats_frame, text=f"Total Generic Alternatives: {stats['total_generics']}", font=('Segoe UI',14), fg=COLORS['text_dark'], bg=COLORS['card']).pack(pady=8)
+            tk.Label(stats_frame, text=f"Average Generics per Medicine: {stats['average_generics']}", font=('Segoe UI',14), fg=COLORS['text_dark'], bg=COLORS['card']).pack(pady=8)
+            distribution = ", ".join(f"{count} generics: {medicines}" for count, medicines in stats['generics_per_medicine'].items()) or "-"
+            tk.Label(stats_frame, text=f"Distribution: {distribution}", font=('Segoe UI',11), fg=COLORS['text_light'], bg=COLORS['card'], wraplength=380).pack(pady=8)
+            for price in stats['prices']:
+                symbol = price['symbol']
+                tk.Label(stats_frame, text=f"💰 Generic Price per unit ({price['currency']}, {price['count']} priced): min {symbol}{price['min']:,.2f} / mean {symbol}{price['mean']:,.2f} / max {symbol}{price['max']:,.2f}", font=('Segoe UI',12), fg=COLORS['success'], bg=COLORS['card'], wraplength=380).pack(pady=8)
             
         except Exception as e:
-            messagebox.showerror("Error", f"Error loading statistics: {str(e)}")
+            self.statistics_failed(e)
+    
+    def show_debug_panel(self):
+        window = tk.Toplevel(self.root)
+        window.title("🛠 Performance Metrics")
+        window.geometry("760x520")
+        window.configure(bg=COLORS['background'])
+        
+        text = tk.Text(window, font=('Consolas', 10), bg=COLORS['card'], fg=COLORS['text_dark'], relief='flat', wrap='none')
+        text.pack(fill='both', expand=True, padx=15, pady=(15, 10))
+        
+        controls = tk.Frame(window, bg=COLORS['background'])
+        controls.pack(fill='x', padx=15, pady=(0, 15))
+        capture_var = tk.StringVar(value="service.search")
+        capture_names = sorted(set(METRICS.snapshot()['latency']) | {"service.search", "service.save", "service.stats", "service.recent", "service.load"})
+        ttk.Combobox(controls, textvariable=capture_var, values=capture_names, width=22).pack(side='left')
+        tk.Button(controls, text="🎯 Profile next", relief='flat', bg=COLORS['accent'], fg='white', command=lambda: METRICS.capture_next(capture_var.get().strip() or None)).pack(side='left', padx=(5, 15))
+        tk.Button(controls, text="💾 Export", relief='flat', bg=COLORS['primary'], fg='white', command=lambda: self.export_metrics(window)).pack(side='left', padx=(0, 5))
+        tk.Button(controls, text="↺ Reset", relief='flat', bg=COLORS['text_light'], fg='white', command=METRICS.reset).pack(side='left')
+        
+        def render():
+            if not window.winfo_exists():
+                return
+            snapshot = METRICS.snapshot()
+            lines = [f"{'operation':<24}{'count':>8}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}  (ms)"]
+            for name, h in snapshot['latency'].items():
+                cells = "".join(f"{'-' if h[k] is None else format(h[k], 'g'):>10}" for k in ('mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'))
+                lines.append(f"{name:<24}{h['count']:>8}{cells}")
+            lines += ["", "counters"] + [f"  {name:<30}{value:>12}" for name, value in snapshot['counters'].items()]
+            lines += ["", "cache"] + [f"  {name:<30}{value}" for name, value in self.service.cache_stats().items()]
+            if METRICS.capture:
+                lines += ["", f"⏳ profiling the next {METRICS.capture}"]
+            if METRICS.captures:
+                lines += ["", "captures"] + [f"  {path}" for path in METRICS.captures[-5:]]
+            text.config(state='normal')
+            text.delete('1.0', 'end')
+            text.insert('1.0', "\n".join(lines))
+            text.config(state='disabled')
+            window.after(DEBUG_REFRESH_MS, render)
+        
+        render()
+    
+    def export_metrics(self, parent):
+        path = filedialog.asksaveasfilename(
+            parent=parent,
+            title="Export metrics",
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json"), ("Prometheus text", "*.prom")]
+        )
+        if path:
+            METRICS.dump(path)
     
     def run(self):
         self.root.mainloop()
 
 class MedicineFormWindow:
-    def __init__(self, parent, refresh_callback):
+    def __init__(self, parent, refresh_callback, executor, save):
         self.parent = parent
         self.refresh_callback = refresh_callback
+        self.executor = executor
+        self.save = save
         self.generic_frames = []
         
         self.window = tk.Toplevel(parent)
@@ -373,8 +675,17 @@ class MedicineFormWindow:
         self.entry_composition = tk.Entry(info_card, font=('Segoe UI',12), width=50)
         self.entry_composition.pack(padx=20, pady=(0,15))
         
-        self.generics_container = tk.Frame(main_frame, bg=COLORS['background'])
-        self.generics_container.pack(fill='both', expand=True)
+        generics_area = tk.Frame(main_frame, bg=COLORS['background'])
+        generics_area.pack(fill='both', expand=True)
+        canvas = tk.Canvas(generics_area, bg=COLORS['background'], highlightthickness=0)
+        scrollbar = ttk.Scrollbar(generics_area, orient='vertical', command=canvas.yview)
+        self.generics_container = tk.Frame(canvas, bg=COLORS['background'])
+        self.generics_container.bind('<Configure>', lambda e: canvas.configure(scrollregion=canvas.bbox('all')))
+        container_window = canvas.create_window((0,0), window=self.generics_container, anchor='nw')
+        canvas.bind('<Configure>', lambda e: canvas.itemconfigure(container_window, width=e.width))
+        canvas.configure(yscrollcommand=scrollbar.set)
+        canvas.pack(side='left', fill='both', expand=True)
+        scrollbar.pack(side='right', fill='y')
         
         add_generic_btn = ModernButton(main_frame, "➕ Add Generic Medicine", self.add_generic, COLORS['primary'], width=25)
         add_generic_btn.pack(pady=15)
@@ -382,14 +693,10 @@ class MedicineFormWindow:
         self.status_label = tk.Label(main_frame, text="", font=('Segoe UI',11), bg=COLORS['background'])
         self.status_label.pack()
         
-        save_btn = ModernButton(main_frame, "💾 Save Medicine", self.save_medicine, COLORS['success'], width=25)
-        save_btn.pack(pady=20)
+        self.save_btn = ModernButton(main_frame, "💾 Save Medicine", self.save_medicine, COLORS['success'], width=25)
+        self.save_btn.pack(pady=20)
     
     def add_generic(self):
-        if len(self.generic_frames) >= MAX_GENERICS:
-            self.status_label.config(text=f"⚠️ Maximum {MAX_GENERICS} generics allowed!", fg='red')
-            return
-        
         idx = len(self.generic_frames) + 1
         generic_frame = tk.Frame(self.generics_container, bg='#F8F9FA', relief='raised', bd=1)
         generic_frame.pack(fill='x', pady=5)
@@ -444,32 +751,53 @@ class MedicineFormWindow:
             self.status_label.config(text="⚠️ Medicine Name and Composition are required!", fg='red')
             return
         
-        data_row = [name, composition, datetime.now().strftime("%Y-%m-%d %H:%M:%S")]
-        
-        for g in self.generic_frames:
-            data_row.extend([
+        medicine = Medicine(name, composition, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        for i, g in enumerate(self.generic_frames):
+            generic = Generic(
                 g['name'].get().strip(),
                 g['composition'].get().strip(),
                 g['price'].get().strip(),
                 g['side_effects'].get().strip()
-            ])
-        
-        for _ in range(MAX_GENERICS - len(self.generic_frames)):
-            data_row.extend(["", "", "", ""])
+            )
+            if not generic.name:
+                if generic.composition or generic.price or generic.side_effects:
+                    self.status_label.config(text=f"⚠️ Generic {i+1} needs a name!", fg='red')
+                    return
+                continue
+            medicine.generics.append(generic)
         
-        try:
-            wb = load_workbook(FILE_NAME)
-            ws = wb.active
-            ws.append(data_row)
-            wb.save(FILE_NAME)
-            wb.close()
-            
+        self.save_btn.button.config(state='disabled')
+        self.status_label.config(text="💾 Saving...", fg=COLORS['text_light'])
+        self.executor.submit(self.save, medicine, on_done=self.medicine_saved, on_error=self.save_failed, cancellable=False)
+    
+    def medicine_saved(self, medicine):
+        self.refresh_callback(medicine)
+        if self.window.winfo_exists():
             self.status_label.config(text="✅ Medicine saved successfully!", fg='green')
-            self.refresh_callback()
             self.window.destroy()
-        except Exception as e:
-            self.status_label.config(text=f"❌ Error saving medicine: {str(e)}", fg='red')
+    
+    def save_failed(self, error):
+        if self.window.winfo_exists():
+            self.save_btn.button.config(state='normal')
+            self.status_label.config(text=f"❌ Error saving medicine: {str(error)}", fg='red')
+
+def report_startup(app):
+    latency = METRICS.snapshot()['latency']
+    for name in ("startup.import", "startup.first_paint", "startup.ready"):
+        print(f"{name:<22}{latency[name]['max_ms']:>10.1f} ms")
+    app.on_close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Medicine Management System")
+    parser.add_argument("--store", default=STORE_PATH, help="catalogue file (.xlsx or .db); defaults to $MEDICINE_STORE or med2.xlsx")
+    parser.add_argument("--startup-time", action="store_true", help="print import, first-paint and ready times, then exit")
+    args = parser.parse_args(argv)
+    
+    METRICS.observe("startup.import", (time.perf_counter() - IMPORT_STARTED) * 1e3)
+    app = MedicineApp(MedicineService.shared(args.store))
+    if args.startup_time:
+        app.on_ready = lambda: report_startup(app)
+    app.run()
 
-initialize_excel()
-app = MedicineApp()
-app.run()
+if __name__ == "__main__":
+    main()
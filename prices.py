@@ -0,0 +1,138 @@
+import re
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from functools import lru_cache
+
+DEFAULT_CURRENCY = "INR"
+CURRENCIES = {
+    "₹": "INR", "rs": "INR", "rs.": "INR", "inr": "INR",
+    "$": "USD", "usd": "USD",
+    "€": "EUR", "eur": "EUR",
+    "£": "GBP", "gbp": "GBP",
+}
+SYMBOLS = {"INR": "₹", "USD": "$", "EUR": "€", "GBP": "£"}
+AMOUNT_PATTERN = re.compile(r"\d+(?:[.,]\d+)*")
+# "12,50": a single comma followed by one or two digits is a decimal comma, not a thousands separator.
+DECIMAL_COMMA_PATTERN = re.compile(r"\d+,\d{1,2}")
+# "50-60", "50 to 60": no single price to rank by.
+RANGE_PATTERN = re.compile(r"\d\s*(?:-|–|\bto\b)\s*(?:₹|\$|€|£|rs\.?\s*)?\d", re.IGNORECASE)
+CURRENCY_PATTERN = re.compile(r"₹|\$|€|£|\b(?:rs\.?|inr|usd|eur|gbp)\b", re.IGNORECASE)
+# "10 tabs for 45 rs": pack size and unit come before the amount.
+PACK_FIRST_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*([^\W\d_]+)\s+(?:for|@|at)\s+\D{0,4}?(\d+(?:[.,]\d+)*)", re.IGNORECASE)
+# "/strip", "per 10 tabs", "/ 100ml": an optional pack size and the unit it is priced per.
+UNIT_PATTERN = re.compile(r"(?:/|\bper\b|\bfor\b)\s*(\d+(?:\.\d+)?)?\s*([^\W\d_]+)", re.IGNORECASE)
+UNITS = {
+    "tab": "tab", "tabs": "tab", "tablet": "tab", "tablets": "tab",
+    "cap": "cap", "caps": "cap", "capsule": "cap", "capsules": "cap",
+    "strip": "strip", "strips": "strip", "bottle": "bottle", "bottles": "bottle",
+    "ml": "ml", "g": "g", "vial": "vial", "vials": "vial", "pack": "pack", "packs": "pack",
+    "box": "box", "boxes": "box", "tube": "tube", "tubes": "tube", "sachet": "sachet", "sachets": "sachet",
+}
+
+
+class Price:
+    __slots__ = ('amount', 'currency', 'unit', 'quantity')
+
+    def __init__(self, amount, currency=DEFAULT_CURRENCY, unit="", quantity=1):
+        self.amount = amount
+        self.currency = currency
+        self.unit = unit
+        self.quantity = quantity
+
+    @property
+    def unit_amount(self):
+        # What ranking compares: "₹50 / 10 tab" and "₹5 / tab" cost the same.
+        return self.amount / self.quantity
+
+    def __str__(self):
+        symbol = SYMBOLS.get(self.currency, f"{self.currency} ")
+        text = f"{symbol}{self.amount:,.2f}"
+        if self.unit:
+            text += f" / {self.quantity:g} {self.unit}" if self.quantity != 1 else f" / {self.unit}"
+        return text
+
+    def __repr__(self):
+        return f"Price({self.amount!r}, {self.currency!r}, {self.unit!r}, {self.quantity!r})"
+
+
+def parse_price(value):
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, Price):
+        return value
+    if isinstance(value, (int, float)):
+        return Price(float(value))
+    return _parse_text(str(value))
+
+
+@lru_cache(maxsize=4096)
+def _parse_text(text):
+    # Catalogues repeat the same few price strings, so parsed prices are shared; treat them as read-only.
+    if RANGE_PATTERN.search(text):
+        return None
+    currency = CURRENCY_PATTERN.search(text)
+    currency = CURRENCIES[currency.group().casefold()] if currency else DEFAULT_CURRENCY
+    pack = PACK_FIRST_PATTERN.search(text)
+    if pack and pack.group(2).casefold() in UNITS and float(pack.group(1)):
+        return Price(_amount(pack.group(3)), currency, UNITS[pack.group(2).casefold()], float(pack.group(1)))
+    match = AMOUNT_PATTERN.search(text)
+    if not match:
+        return None
+    price = Price(_amount(match.group()), currency)
+    unit = UNIT_PATTERN.search(text, match.end())
+    if unit and unit.group(2).casefold() in UNITS:
+        price.unit = UNITS[unit.group(2).casefold()]
+        price.quantity = float(unit.group(1)) if unit.group(1) and float(unit.group(1)) else 1
+    return price
+
+
+def _amount(text):
+    if DECIMAL_COMMA_PATTERN.fullmatch(text):
+        return float(text.replace(",", "."))
+    return float(text.replace(",", ""))
+
+
+def price_key(price):
+    # Amounts are only ordered within a currency; the default currency ranks first.
+    if price is None:
+        return (True, False, "", 0.0)
+    return (False, price.currency != DEFAULT_CURRENCY, price.currency, price.unit_amount)
+
+
+class PriceIndex:
+    # Per-key, per-currency price lists, appended in any order and sorted lazily before the first query.
+    # Amounts in different currencies are never compared with each other.
+    def __init__(self):
+        self.entries = defaultdict(list)
+        self.unsorted = set()
+
+    def add(self, key, price, item):
+        key = (key, price.currency)
+        self.entries[key].append((price.unit_amount, item))
+        self.unsorted.add(key)
+
+    def sort(self):
+        for key in self.unsorted:
+            self.entries[key].sort()
+        self.unsorted.clear()
+
+    def _sorted(self, key):
+        entries = self.entries.get(key, [])
+        if key in self.unsorted:
+            entries.sort()
+            self.unsorted.discard(key)
+        return entries
+
+    def cheapest(self, key, k=5, currency=DEFAULT_CURRENCY):
+        return [item for _, item in self._sorted((key, currency))[:k]]
+
+    def between(self, key, low=None, high=None, limit=None, currency=DEFAULT_CURRENCY):
+        entries = self._sorted((key, currency))
+        start = 0 if low is None else bisect_left(entries, (low,))
+        end = len(entries) if high is None else bisect_right(entries, (high, float("inf")))
+        if limit is not None:
+            end = min(end, start + limit)
+        return [item for _, item in entries[start:end]]
+
+    def count(self, key, currency=DEFAULT_CURRENCY):
+        return len(self.entries.get((key, currency), ()))
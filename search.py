@@ -0,0 +1,145 @@
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+
+from medicine_index import index_key
+from stats import generic_slots
+
+EXACT, PREFIX, FUZZY = 3, 2, 1
+MIN_SIMILARITY = 0.3
+# Rarest query trigrams that fuzzy candidates are drawn from; one dropped or swapped letter
+# changes at most two or three of them.
+SEED_GRAMS = 3
+# Candidates kept per fuzzy query before weak ones are pruned, and the most that are scored.
+CANDIDATE_BUDGET = 2_000
+# Query trigrams a kept candidate may lack once pruning starts.
+MAX_MISSES = 2
+# Rough cost of one bisect lookup relative to scanning one posting entry.
+BISECT_COST = 30
+
+
+def normalize(text):
+    return " ".join(str(text).casefold().split())
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchResult:
+    __slots__ = ('medicine', 'field', 'matched', 'kind', 'score')
+
+    def __init__(self, medicine, field, matched, kind, score):
+        self.medicine = medicine
+        self.field = field
+        self.matched = matched
+        self.kind = kind
+        self.score = score
+
+    def __repr__(self):
+        return f"SearchResult({self.medicine!r}, {self.field!r}, {self.matched!r}, score={self.score:.2f})"
+
+
+class SearchEngine:
+    def __init__(self, rows=()):
+        # Each term is (normalised text, medicine name, field, original text).
+        self.terms = []
+        self.term_trigrams = []
+        self.prefixes = []
+        self.postings = defaultdict(list)
+        self._bulk = True
+        for row in rows:
+            self.add(row)
+        self.prefixes.sort()
+        self._bulk = False
+
+    def add(self, row):
+        if not row or row[0] is None or not str(row[0]).strip():
+            return
+        medicine = str(row[0]).strip()
+        self._add_term(row[0], medicine, 'name')
+        if len(row) > 1 and row[1]:
+            self._add_term(row[1], medicine, 'composition')
+        for generic in generic_slots(row):
+            self._add_term(generic[0], medicine, 'generic')
+            if len(generic) > 1 and generic[1]:
+                self._add_term(generic[1], medicine, 'composition')
+
+    def _add_term(self, text, medicine, field):
+        normalized = normalize(text)
+        if not normalized:
+            return
+        term_id = len(self.terms)
+        self.terms.append((normalized, medicine, field, str(text).strip()))
+        grams = trigrams(normalized)
+        self.term_trigrams.append(len(grams))
+        for gram in grams:
+            self.postings[gram].append(term_id)
+        # Index every word start so "500mg" finds "Paracetamol 500mg".
+        start = 0
+        for word in normalized.split(" "):
+            if self._bulk:
+                self.prefixes.append((normalized[start:], term_id))
+            else:
+                insort(self.prefixes, (normalized[start:], term_id))
+            start += len(word) + 1
+
+    def search(self, query, limit=10):
+        query = normalize(query)
+        if not query:
+            return []
+        best = {}
+        self._prefix_matches(query, best, limit)
+        if len(best) < limit and not any(r.kind == EXACT for r in best.values()):
+            self._fuzzy_matches(query, best)
+        ranked = sorted(best.values(), key=lambda r: (-r.kind, -r.score, r.medicine.casefold()))
+        return ranked[:limit]
+
+    def _offer(self, best, term_id, kind, score):
+        normalized, medicine, field, original = self.terms[term_id]
+        key = index_key(medicine)
+        current = best.get(key)
+        if current is None or (kind, score) > (current.kind, current.score):
+            best[key] = SearchResult(medicine, field, original, kind, score)
+
+    def _prefix_matches(self, query, best, limit):
+        position = bisect_left(self.prefixes, (query,))
+        scanned = 0
+        while position < len(self.prefixes) and scanned < limit * 20:
+            text, term_id = self.prefixes[position]
+            if not text.startswith(query):
+                break
+            normalized = self.terms[term_id][0]
+            kind = EXACT if normalized == query else PREFIX
+            self._offer(best, term_id, kind, len(query) / len(normalized))
+            position += 1
+            scanned += 1
+
+    def _fuzzy_matches(self, query, best):
+        # A term one typo away from the query still holds one of its SEED_GRAMS rarest trigrams, so
+        # candidates are drawn from those postings alone. They are then counted against every other
+        # trigram of the query, rarest first; once there are too many, candidates already missing
+        # more than MAX_MISSES of the trigrams seen so far are dropped. No trigram is ever skipped.
+        grams = sorted(trigrams(query), key=lambda g: len(self.postings.get(g, ())))
+        present = [gram for gram in grams if gram in self.postings]
+        shared = Counter()
+        for gram in present[:SEED_GRAMS]:
+            shared.update(self.postings[gram])
+        for seen, gram in enumerate(present[SEED_GRAMS:], start=SEED_GRAMS + 1):
+            posting = self.postings[gram]
+            if len(shared) * BISECT_COST < len(posting):
+                # Few candidates against a long posting: look each one up in the sorted term ids.
+                for term_id in list(shared):
+                    position = bisect_left(posting, term_id)
+                    if position < len(posting) and posting[position] == term_id:
+                        shared[term_id] += 1
+            else:
+                shared.update(shared.keys() & posting)
+            if len(shared) > CANDIDATE_BUDGET:
+                floor = seen - MAX_MISSES
+                shared = Counter({term_id: common for term_id, common in shared.items() if common >= floor})
+        query_size = len(grams)
+        for term_id, common in shared.most_common(CANDIDATE_BUDGET):
+            score = 2 * common / (query_size + self.term_trigrams[term_id])
+            if score >= MIN_SIMILARITY:
+                self._offer(best, term_id, FUZZY, score)
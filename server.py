@@ -0,0 +1,164 @@
+import argparse
+import asyncio
+import json
+import os
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from core import MedicineService
+from metrics import METRICS, timer
+from models import Medicine
+from prices import DEFAULT_CURRENCY
+
+COMPACT_INTERVAL_SECONDS = 60
+REFRESH_INTERVAL_SECONDS = 5
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def product_dict(product):
+    return {
+        'name': product.name,
+        'medicine': product.medicine,
+        'composition': product.composition,
+        'price': str(product.price),
+        'unit_price': product.price.unit_amount,
+        'currency': product.price.currency,
+    }
+
+
+class MedicineServer:
+    def __init__(self, service):
+        self.service = service
+
+    async def run_blocking(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = [unquote(part) for part in url.path.strip("/").split("/") if part]
+
+        if parts == ["search"] and method == "GET":
+            limit = int(query.get("limit", 10))
+            return 200, {'results': [m.to_dict() for m in self.service.search(query.get("q", ""), limit)]}
+        if len(parts) == 2 and parts[0] == "medicines" and method == "GET":
+            medicine = self.service.get(parts[1]) if self.service.ready else await self.run_blocking(self.service.get, parts[1])
+            if medicine is None:
+                raise HttpError(404, f"Medicine {parts[1]!r} not found")
+            return 200, medicine.to_dict()
+        if parts == ["medicines"] and method == "POST":
+            try:
+                medicine = Medicine.from_dict(json.loads(body or b"{}"))
+            except (ValueError, AttributeError) as e:
+                raise HttpError(400, f"Invalid medicine JSON: {e}")
+            if not medicine.name or not medicine.composition:
+                raise HttpError(400, "Medicine name and composition are required")
+            return 201, (await self.run_blocking(self.service.add, medicine)).to_dict()
+        if parts == ["stats"] and method == "GET":
+            return 200, self.service.stats() if self.service.ready else await self.run_blocking(self.service.stats)
+        if parts == ["recent"] and method == "GET":
+            medicines = await self.run_blocking(self.service.recent, int(query.get("count", 5)))
+            return 200, {'results': [m.to_dict() for m in medicines]}
+        if len(parts) == 3 and parts[0] == "medicines" and parts[2] == "cheapest" and method == "GET":
+            products = self.service.cheapest_equivalents(parts[1], int(query.get("k", 5)), query.get("currency", DEFAULT_CURRENCY).upper())
+            return 200, {'results': [product_dict(p) for p in products]}
+        if parts == ["prices"] and method == "GET":
+            low, high = (float(query[k]) if k in query else None for k in ("min", "max"))
+            products = self.service.priced_between(low, high, query.get("composition"), int(query.get("limit", 50)), query.get("currency", DEFAULT_CURRENCY).upper())
+            return 200, {'results': [product_dict(p) for p in products]}
+        if parts == ["cache"] and method == "GET":
+            return 200, self.service.cache_stats()
+        if parts == ["metrics"] and method == "GET":
+            return 200, METRICS.to_prometheus() if query.get("format") == "prometheus" else METRICS.snapshot()
+        if parts and parts[0] in ("search", "medicines", "stats", "recent", "prices", "cache", "metrics"):
+            raise HttpError(405, f"{method} not allowed on {url.path}")
+        raise HttpError(404, f"No route for {url.path}")
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                with timer("http.request"):
+                    try:
+                        status, payload = await self.dispatch(method.upper(), target, body)
+                    except HttpError as e:
+                        status, payload = e.status, {'error': str(e)}
+                    except ValueError as e:
+                        status, payload = 400, {'error': str(e)}
+                    except Exception as e:
+                        status, payload = 500, {'error': str(e)}
+                METRICS.incr(f"http.status_{status}")
+
+                if isinstance(payload, str):
+                    data, content_type = payload.encode(), "text/plain; version=0.0.4"
+                else:
+                    data, content_type = json.dumps(payload, default=str).encode(), "application/json"
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def compact_periodically(self):
+        while True:
+            await asyncio.sleep(COMPACT_INTERVAL_SECONDS)
+            await self.run_blocking(self.service.compact)
+
+    async def refresh_periodically(self):
+        while True:
+            await asyncio.sleep(REFRESH_INTERVAL_SECONDS)
+            await self.run_blocking(self.service.refresh_if_stale)
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port)
+        compactor = asyncio.create_task(self.compact_periodically())
+        refresher = asyncio.create_task(self.refresh_periodically())
+        print(f"Serving {len(self.service.index)} medicines on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            compactor.cancel()
+            refresher.cancel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the medicine store as JSON over HTTP.")
+    parser.add_argument("--store", default=os.environ.get("MEDICINE_STORE", "med2.xlsx"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    service = MedicineService.shared(args.store).load()
+    try:
+        asyncio.run(MedicineServer(service).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
@@ -0,0 +1,89 @@
+from collections import Counter
+
+from prices import DEFAULT_CURRENCY, SYMBOLS, parse_price
+
+
+def generic_slots(row):
+    for name_idx in range(3, len(row), 4):
+        if row[name_idx] and str(row[name_idx]).strip():
+            yield row[name_idx:name_idx + 4]
+
+
+class PriceSummary:
+    # Per-unit prices in one currency; amounts in different currencies are never combined.
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, amount):
+        self.count += 1
+        self.total += amount
+        self.min = amount if self.min is None else min(self.min, amount)
+        self.max = amount if self.max is None else max(self.max, amount)
+
+    def snapshot(self, currency):
+        return {
+            'currency': currency,
+            'symbol': SYMBOLS.get(currency, f"{currency} "),
+            'count': self.count,
+            'min': round(self.min, 2),
+            'mean': round(self.total / self.count, 2),
+            'max': round(self.max, 2),
+        }
+
+
+class StatsAggregator:
+    def __init__(self, rows=()):
+        self.total_medicines = 0
+        self.total_generics = 0
+        self.generics_per_medicine = Counter()
+        self.priced_generics = 0
+        self.prices = {}
+        for row in rows:
+            self.add(row)
+
+    def add(self, row):
+        self.total_medicines += 1
+        count = 0
+        for generic in generic_slots(row):
+            count += 1
+            price = parse_price(generic[2]) if len(generic) > 2 else None
+            if price is None:
+                continue
+            self.priced_generics += 1
+            summary = self.prices.get(price.currency)
+            if summary is None:
+                summary = self.prices[price.currency] = PriceSummary()
+            # Per unit, so "₹50 / 10 tab" counts as ₹5 rather than ₹50.
+            summary.add(price.unit_amount)
+        self.total_generics += count
+        self.generics_per_medicine[count] += 1
+
+    def snapshot(self):
+        return {
+            'total_medicines': self.total_medicines,
+            'total_generics': self.total_generics,
+            'average_generics': round(self.total_generics / self.total_medicines, 2) if self.total_medicines else 0,
+            'generics_per_medicine': dict(sorted(self.generics_per_medicine.items())),
+            'priced_generics': self.priced_generics,
+            # The default currency first, then the rest by name.
+            'prices': [
+                self.prices[currency].snapshot(currency)
+                for currency in sorted(self.prices, key=lambda currency: (currency != DEFAULT_CURRENCY, currency))
+            ],
+        }
+
+
+def compute_statistics(store):
+    return StatsAggregator(store.rows()).snapshot()
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    from storage import open_storage
+
+    print(json.dumps(compute_statistics(open_storage(sys.argv[1] if len(sys.argv) > 1 else "med2.xlsx")), indent=2))
@@ -0,0 +1,406 @@
+import argparse
+import os
+import sqlite3
+import threading
+import zipfile
+from itertools import chain, islice
+from xml.etree import ElementTree
+
+from concurrency import FileLock
+from journal import Journal
+from metrics import incr, timed
+from packed import PackedCatalogue
+from streaming import TailCache, iter_rows
+
+# Generic slots in the flat layout; rows may carry more groups beyond these.
+MAX_GENERICS = 5
+GENERIC_FIELDS = ("Name", "Composition", "Price", "Side Effects")
+
+
+def headers(generic_slots=MAX_GENERICS):
+    return ["Medicine Name", "Composition", "Date Added"] + [
+        f"Generic {i} {field}" for i in range(1, generic_slots + 1) for field in GENERIC_FIELDS
+    ]
+
+
+HEADERS = headers()
+ROW_WIDTH = len(HEADERS)
+# Workbook property recording "<journal id>:<rows>" of the journal last folded into it.
+CHECKPOINT_PROPERTY = "journal_checkpoint"
+
+
+def pad_row(row):
+    row = list(row)
+    width = max(ROW_WIDTH, 3 + -(-(len(row) - 3) // 4) * 4)
+    return row + [""] * (width - len(row))
+
+
+def workbook_checkpoint(file_name, journal_id):
+    # How many leading rows of journal_id the workbook already holds. Read straight from
+    # docProps/custom.xml so crash recovery never pays for openpyxl.
+    if journal_id is None:
+        return 0
+    try:
+        with zipfile.ZipFile(file_name) as archive:
+            root = ElementTree.fromstring(archive.read("docProps/custom.xml"))
+    except (OSError, KeyError, zipfile.BadZipFile, ElementTree.ParseError):
+        return 0
+    for prop in root:
+        if prop.get("name") == CHECKPOINT_PROPERTY:
+            applied_id, _, count = "".join(prop.itertext()).partition(":")
+            return int(count) if applied_id == journal_id and count.isdigit() else 0
+    return 0
+
+
+class XlsxStorage:
+    # Pending journal rows that trigger a compaction into the workbook.
+    COMPACT_THRESHOLD = 50
+    # Every batch rewrites the workbook, so bulk imports use as few as possible.
+    BULK_BATCH_SIZE = 100_000
+
+    def __init__(self, file_name, packed=True):
+        self.file_name = file_name
+        self.journal = Journal(file_name + ".wal")
+        self.tail_cache = TailCache(file_name)
+        # Optional binary mirror of the workbook (med2.xlsx.bin) for fast reads.
+        self.packed = PackedCatalogue(file_name) if packed else None
+        self.lock = threading.RLock()
+        # Guards the journal and workbook against other processes sharing the file.
+        self.file_lock = FileLock(file_name + ".lock")
+
+    def initialize(self):
+        with self.lock, self.file_lock:
+            if not os.path.exists(self.file_name):
+                from openpyxl import Workbook
+
+                wb = Workbook()
+                wb.active.append(HEADERS)
+                wb.save(self.file_name)
+            # Finish a compaction that crashed after replacing the workbook but before clearing the journal.
+            if len(self.journal) and workbook_checkpoint(self.file_name, self.journal.ident()):
+                self.compact()
+
+    def version(self):
+        st = os.stat(self.file_name)
+        return (st.st_mtime_ns, st.st_size, self.journal.size())
+
+    def rows(self, start=0):
+        # Workbook rows followed by pending journal rows; compaction keeps this order stable.
+        snapshot = self._packed_snapshot()
+        if snapshot is not None:
+            # A start past the snapshot lands in the journal; skip into it rather than re-reading the workbook.
+            n = len(snapshot)
+            return chain(snapshot.rows(min(start, n)), islice(self.journal.rows(), max(0, start - n), None))
+        return islice(chain(self._workbook_rows(), self.journal.rows()), start, None)
+
+    def _packed_snapshot(self):
+        if self.packed is None:
+            return None
+        with self.lock, self.file_lock:
+            return self.packed.load()
+
+    def _workbook_rows(self):
+        # A full read of the workbook also rebuilds the binary mirror on the way through.
+        builder = self.packed.builder() if self.packed is not None else None
+        finished = False
+        try:
+            for row in iter_rows(self.file_name):
+                if builder is not None:
+                    builder.add(row)
+                yield row
+            if builder is not None:
+                with self.lock, self.file_lock:
+                    builder.finish()
+                finished = True
+        finally:
+            if builder is not None and not finished:
+                builder.abort()
+
+    def recent(self, count):
+        if not count:
+            return []
+        pending = list(self.journal.rows())
+        wanted = max(0, count - len(pending))
+        snapshot = self._packed_snapshot()
+        if snapshot is not None:
+            # The mirror serves any tail length by offset; the workbook is only scanned without one.
+            rows = list(snapshot.rows(max(0, len(snapshot) - wanted))) if wanted else []
+        else:
+            rows = self.tail_cache.get(wanted)
+        return (rows + pending)[-count:]
+
+    @timed("store.find")
+    def find(self, name):
+        key = str(name).strip().casefold()
+        snapshot = self._packed_snapshot()
+        if snapshot is not None:
+            row = snapshot.find(name)
+            if row is not None:
+                return row
+        for row in self.journal.rows() if snapshot is not None else self.rows():
+            if row[0] and str(row[0]).strip().casefold() == key:
+                return row
+        return None
+
+    def append(self, row):
+        self.append_group([row])
+
+    def append_group(self, rows):
+        # Returns the store version just before and after the write, both taken under the lock.
+        with self.lock, self.file_lock:
+            before = self.version()
+            self.journal.append_many(rows)
+            return before, self.version()
+
+    def needs_compaction(self):
+        # Checked by the caller after a save; the save itself never waits on, or fails with, a compaction.
+        return len(self.journal) >= self.COMPACT_THRESHOLD
+
+    def append_many(self, rows):
+        with self.lock, self.file_lock:
+            self.compact()
+            self._write_rows(rows)
+
+    def compact(self):
+        # The workbook is reloaded under the lock, so appends from other processes are merged, not overwritten.
+        # The workbook records how much of the journal it holds, so rows a crashed compaction
+        # already saved are skipped instead of being appended twice.
+        with self.lock, self.file_lock:
+            before = self.version()
+            journal_id = self.journal.ident()
+            rows = list(self.journal.rows())
+            applied = workbook_checkpoint(self.file_name, journal_id)
+            if rows[applied:]:
+                self._write_rows(rows[applied:], f"{journal_id}:{len(rows)}" if journal_id else None)
+            self.journal.clear()
+            return before, self.version()
+
+    @timed("workbook.save")
+    def _write_rows(self, rows, checkpoint=None):
+        rows = list(rows)
+        from openpyxl import load_workbook
+
+        cached_tail = self.tail_cache.load()
+        snapshot = self.packed.load() if self.packed is not None else None
+        wb = load_workbook(self.file_name)
+        try:
+            ws = wb.active
+            widest = max(len(row) for row in rows) if rows else 0
+            if widest > ws.max_column:
+                for column, title in enumerate(headers(-(-(widest - 3) // 4)), start=1):
+                    ws.cell(row=1, column=column, value=title)
+            for row in rows:
+                ws.append(list(row))
+            if checkpoint is not None:
+                if CHECKPOINT_PROPERTY in wb.custom_doc_props.names:
+                    wb.custom_doc_props[CHECKPOINT_PROPERTY].value = checkpoint
+                else:
+                    from openpyxl.packaging.custom import StringProperty
+
+                    wb.custom_doc_props.append(StringProperty(name=CHECKPOINT_PROPERTY, value=checkpoint))
+            tmp_name = self.file_name + ".tmp"
+            wb.save(tmp_name)
+            os.replace(tmp_name, self.file_name)
+        finally:
+            wb.close()
+        if cached_tail is not None:
+            self.tail_cache.save(cached_tail + [tuple(row) for row in rows])
+        if snapshot is not None:
+            self.packed.append(snapshot, rows)
+
+    def close(self):
+        self.compact()
+
+
+class SqliteStorage:
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS medicines (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            name_key TEXT NOT NULL,
+            composition TEXT,
+            date_added TEXT
+        );
+        CREATE TABLE IF NOT EXISTS generics (
+            medicine_id INTEGER NOT NULL REFERENCES medicines(id),
+            position INTEGER NOT NULL,
+            name TEXT,
+            name_key TEXT,
+            composition TEXT,
+            price TEXT,
+            side_effects TEXT,
+            PRIMARY KEY (medicine_id, position)
+        );
+        CREATE INDEX IF NOT EXISTS idx_medicines_name_key ON medicines(name_key);
+        CREATE INDEX IF NOT EXISTS idx_generics_name_key ON generics(name_key);
+    """
+    BULK_BATCH_SIZE = 5_000
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        # One connection shared by the UI and worker threads, serialised by the lock.
+        self.conn = sqlite3.connect(file_name, timeout=30, check_same_thread=False)
+        self.lock = threading.RLock()
+
+    def initialize(self):
+        with self.lock:
+            self.conn.executescript(self.SCHEMA)
+            self.conn.commit()
+
+    def _assemble(self, medicine_rows):
+        rows = []
+        with self.lock:
+            for medicine_id, name, composition, date_added in medicine_rows:
+                row = [name, composition, date_added]
+                for generic in self.conn.execute(
+                    "SELECT name, composition, price, side_effects FROM generics "
+                    "WHERE medicine_id = ? ORDER BY position",
+                    (medicine_id,),
+                ):
+                    row.extend(generic)
+                rows.append(tuple(pad_row(row)))
+        return rows
+
+    def rows(self, start=0):
+        last_id = 0
+        if start:
+            with self.lock:
+                before = self.conn.execute(
+                    "SELECT id FROM medicines ORDER BY id LIMIT 1 OFFSET ?", (start - 1,)
+                ).fetchone()
+            if before is None:
+                return
+            last_id = before[0]
+        while True:
+            with self.lock:
+                batch = self.conn.execute(
+                    "SELECT id, name, composition, date_added FROM medicines "
+                    "WHERE id > ? ORDER BY id LIMIT 1000",
+                    (last_id,),
+                ).fetchall()
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            yield from self._assemble(batch)
+
+    def recent(self, count):
+        with self.lock:
+            medicine_rows = self.conn.execute(
+                "SELECT id, name, composition, date_added FROM medicines ORDER BY id DESC LIMIT ?",
+                (count,),
+            ).fetchall()
+        return self._assemble(reversed(medicine_rows))
+
+    @timed("store.find")
+    def find(self, name):
+        with self.lock:
+            medicine_rows = self.conn.execute(
+                "SELECT id, name, composition, date_added FROM medicines "
+                "WHERE name_key = ? ORDER BY id LIMIT 1",
+                (str(name).strip().casefold(),),
+            ).fetchall()
+        rows = self._assemble(medicine_rows)
+        return rows[0] if rows else None
+
+    def version(self):
+        # data_version only moves when another connection commits.
+        with self.lock:
+            return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def append(self, row):
+        self.append_many([row])
+
+    def append_group(self, rows):
+        with self.lock:
+            before = self.version()
+            self.append_many(rows)
+            return before, self.version()
+
+    @timed("sqlite.insert")
+    def append_many(self, rows):
+        with self.lock, self.conn:
+            for row in rows:
+                self._insert(pad_row(row))
+        incr("sqlite.rows_inserted", len(rows))
+
+    def _insert(self, row):
+        name = "" if row[0] is None else str(row[0])
+        cursor = self.conn.execute(
+            "INSERT INTO medicines (name, name_key, composition, date_added) VALUES (?, ?, ?, ?)",
+            (name, name.strip().casefold(), row[1], row[2]),
+        )
+        for position, start in enumerate(range(3, len(row), 4)):
+            name, composition, price, side_effects = row[start:start + 4]
+            if name is None or not str(name).strip():
+                continue
+            self.conn.execute(
+                "INSERT INTO generics VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (cursor.lastrowid, position, str(name), str(name).strip().casefold(),
+                 composition, price, side_effects),
+            )
+
+    def import_xlsx(self, xlsx_path):
+        source = XlsxStorage(xlsx_path)
+        batch = []
+        count = 0
+        for row in source.rows():
+            if row[0] is None or not str(row[0]).strip():
+                continue
+            batch.append(row)
+            if len(batch) >= 1000:
+                self.append_many(batch)
+                count += len(batch)
+                batch = []
+        self.append_many(batch)
+        return count + len(batch)
+
+    def compact(self):
+        version = self.version()
+        return version, version
+
+    def needs_compaction(self):
+        return False
+
+    def export_xlsx(self, xlsx_path):
+        with self.lock:
+            widest = self.conn.execute("SELECT MAX(position) + 1 FROM generics").fetchone()[0] or 0
+        from openpyxl import Workbook
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        ws.append(headers(max(MAX_GENERICS, widest)))
+        count = 0
+        for row in self.rows():
+            ws.append(list(row))
+            count += 1
+        wb.save(xlsx_path)
+        return count
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def open_storage(file_name):
+    if os.path.splitext(file_name)[1].lower() in (".db", ".sqlite", ".sqlite3"):
+        storage = SqliteStorage(file_name)
+    else:
+        storage = XlsxStorage(file_name)
+    storage.initialize()
+    return storage
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move the medicine catalogue between XLSX and SQLite.")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("xlsx")
+    parser.add_argument("database")
+    args = parser.parse_args()
+
+    db = SqliteStorage(args.database)
+    db.initialize()
+    if args.command == "import":
+        print(f"Imported {db.import_xlsx(args.xlsx)} medicines into {args.database}")
+    else:
+        print(f"Exported {db.export_xlsx(args.xlsx)} medicines to {args.xlsx}")
+    db.close()
@@ -0,0 +1,80 @@
+import json
+import os
+import time
+from collections import deque
+
+from metrics import METRICS, timer
+
+TAIL_CACHE_SIZE = 20
+
+
+def iter_rows(file_name, min_row=2):
+    for _, row in iter_numbered_rows(file_name, min_row):
+        yield row
+
+
+def iter_numbered_rows(file_name, min_row=2):
+    # Non-blank rows with their sheet row numbers, which blank rows in between do not shift.
+    # openpyxl costs ~150 ms to import, so it is only loaded once a workbook is actually read.
+    from openpyxl import load_workbook
+
+    with timer("workbook.open"):
+        wb = load_workbook(file_name, read_only=True)
+    rows = wb.active.iter_rows(min_row=min_row, values_only=True)
+    # Only time spent inside openpyxl counts as the scan, not whatever the consumer does with each row.
+    scanning = 0.0
+    row_number = min_row - 1
+    try:
+        while True:
+            row_number += 1
+            start = time.perf_counter()
+            row = next(rows, None)
+            scanning += time.perf_counter() - start
+            if row is None:
+                break
+            if any(cell is not None for cell in row):
+                yield row_number, row
+    finally:
+        METRICS.observe("workbook.scan", scanning * 1e3)
+        wb.close()
+
+
+def tail(file_name, count):
+    return list(deque(iter_rows(file_name), maxlen=count))
+
+
+class TailCache:
+    def __init__(self, file_name, size=TAIL_CACHE_SIZE):
+        self.file_name = file_name
+        self.path = file_name + ".tail.json"
+        self.size = size
+
+    def _stamp(self):
+        st = os.stat(self.file_name)
+        return [st.st_mtime_ns, st.st_size]
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached['stamp'] == self._stamp():
+                return [tuple(row) for row in cached['rows']]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def save(self, rows):
+        rows = list(rows)[-self.size:]
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({'stamp': self._stamp(), 'rows': [list(row) for row in rows]}, f, default=str)
+        os.replace(tmp_path, self.path)
+
+    def get(self, count):
+        if count > self.size:
+            return tail(self.file_name, count)
+        rows = self.load()
+        if rows is None:
+            rows = tail(self.file_name, self.size)
+            self.save(rows)
+        return rows[-count:] if count else []
@@ -0,0 +1,29 @@
+from openpyxl import Workbook
+
+from bulk_import import import_file, read_source
+from storage import open_storage
+
+
+def test_xlsx_lines_are_sheet_rows(tmp_path):
+    path = str(tmp_path / "supplier.xlsx")
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Medicine Name", "Composition"])
+    ws.append(["Crocin", "Paracetamol 500mg"])
+    ws.cell(row=5, column=1, value="Dolo")
+    ws.cell(row=6, column=1, value="Brufen")
+    ws.cell(row=6, column=2, value="Ibuprofen 400mg")
+    wb.save(path)
+
+    assert [line_no for line_no, _ in read_source(path)] == [2, 5, 6]
+
+
+def test_csv_blank_lines_are_skipped_not_rejected(tmp_path):
+    path = tmp_path / "supplier.csv"
+    path.write_text('Medicine Name,Composition\nCrocin,Paracetamol 500mg\n\n,\n"Dolo\n650",Paracetamol 650mg\nBrufen,\n',
+                    encoding="utf-8")
+
+    report = import_file(str(path), open_storage(str(tmp_path / "med.db")))
+
+    assert (report.read, report.imported) == (3, 2)
+    assert [(line_no, reason) for line_no, reason, _ in report.rejected] == [(7, "missing composition")]
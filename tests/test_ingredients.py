@@ -0,0 +1,33 @@
+from ingredients import IngredientIndex, parse_composition
+
+
+def test_digits_stay_in_ingredient_names():
+    assert parse_composition("Vitamin B12 500mcg") == [("vitamin b12", "500mcg")]
+    assert parse_composition("Vitamin B6 10mg") == [("vitamin b6", "10mg")]
+    assert parse_composition("Vitamin D3 1000 IU") == [("vitamin d3", "1000iu")]
+    assert parse_composition("Omega-3 1g") == [("omega-3", "1g")]
+
+
+def test_percentage_strengths():
+    assert parse_composition("Dextrose 5%") == [("dextrose", "5%")]
+    assert parse_composition("Dextrose 10%") == [("dextrose", "10%")]
+
+
+def test_salts_units_and_combinations():
+    assert parse_composition("Cetirizine Hydrochloride 10mg") == [("cetirizine", "10mg")]
+    assert parse_composition("Amoxicillin 250mg + Clavulanic Acid 125mg") == [
+        ("amoxicillin", "250mg"), ("clavulanic acid", "125mg"),
+    ]
+    assert parse_composition("Paracetamol 125 mg / 5 ml") == [("paracetamol", "125mg/5ml")]
+    assert parse_composition(None) == []
+
+
+def test_equivalents_do_not_cross_vitamins_or_concentrations():
+    index = IngredientIndex([
+        ("Neurobion", "Vitamin B12 500mcg", "", "B12 Generic", "Vitamin B12 500mcg", "40", ""),
+        ("Pyridoxine", "Vitamin B6 500mcg", "", "B6 Generic", "Vitamin B6 500mcg", "5", ""),
+        ("Dextrose 5", "Dextrose 5%", "", "D5 Generic", "Dextrose 5%", "30", ""),
+        ("Dextrose 10", "Dextrose 10%", "", "D10 Generic", "Dextrose 10%", "20", ""),
+    ])
+    assert [p.name for p in index.cheapest_equivalents("Neurobion")] == ["B12 Generic"]
+    assert [p.name for p in index.cheapest_equivalents("Dextrose 5")] == ["D5 Generic"]
@@ -0,0 +1,29 @@
+from journal import Journal
+
+
+def test_append_after_torn_line_keeps_the_row(tmp_path):
+    path = str(tmp_path / "med.xlsx.wal")
+    Journal(path).append(["A"])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('["torn", "par')
+
+    journal = Journal(path)
+    assert len(journal) == 1
+    journal.append(["B"])
+    journal.append(["C"])
+
+    assert list(journal.rows()) == [("A",), ("B",), ("C",)]
+    assert len(journal) == 3
+    assert len(Journal(path)) == 3
+
+
+def test_torn_first_line_still_gets_an_id(tmp_path):
+    path = str(tmp_path / "med.xlsx.wal")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"journ')
+
+    journal = Journal(path)
+    journal.append(["A"])
+
+    assert journal.ident() is not None
+    assert list(journal.rows()) == [("A",)]
@@ -0,0 +1,64 @@
+import os
+
+from packed import PackedCatalogue
+from storage import open_storage
+
+
+def build(tmp_path, rows):
+    source = tmp_path / "med.xlsx"
+    source.write_bytes(b"workbook")
+    catalogue = PackedCatalogue(str(source))
+    builder = catalogue.builder()
+    for row in rows:
+        builder.add(row)
+    assert builder.finish()
+    return catalogue
+
+
+def test_find_is_case_insensitive_and_first_occurrence_wins(tmp_path):
+    catalogue = build(tmp_path, [
+        ("Crocin", "Paracetamol 500mg", "2024-01-01"),
+        ("Brufen", "Ibuprofen 400mg", "2024-01-02", "Ibugesic", "Ibuprofen 400mg", "₹20", "Nausea"),
+        ("CROCIN", "Paracetamol 650mg", "2024-01-03"),
+    ])
+    snapshot = catalogue.load()
+
+    assert len(snapshot) == 3
+    assert snapshot.find("  crocin ")[1] == "Paracetamol 500mg"
+    assert snapshot.find("brufen") == ("Brufen", "Ibuprofen 400mg", "2024-01-02", "Ibugesic", "Ibuprofen 400mg", "₹20", "Nausea")
+    assert snapshot.find("Dolo") is None
+    assert [row[0] for row in snapshot.rows(1)] == ["Brufen", "CROCIN"]
+
+
+def test_append_keeps_the_name_order(tmp_path):
+    catalogue = build(tmp_path, [("Dolo", "x", ""), ("Brufen", "x", ""), ("Crocin", "x", "")])
+    catalogue.append(catalogue.load(), [("Azee", "x", ""), ("crocin", "y", ""), ("Evion", "x", "")])
+    snapshot = catalogue.load()
+
+    names = [snapshot.record(offset)[0] for offset in snapshot.sorted]
+    assert names == ["Azee", "Brufen", "Crocin", "crocin", "Dolo", "Evion"]
+    assert [row[0] for row in snapshot.rows()] == ["Dolo", "Brufen", "Crocin", "Azee", "crocin", "Evion"]
+    assert snapshot.find("CROCIN")[1] == "x"
+    assert snapshot.find("evion") is not None
+
+
+def test_changed_workbook_makes_the_mirror_stale(tmp_path):
+    catalogue = build(tmp_path, [("Crocin", "x", "")])
+    assert catalogue.load() is not None
+
+    with open(catalogue.source_path, "ab") as f:
+        f.write(b" edited elsewhere")
+    assert catalogue.load() is None
+
+
+def test_rows_past_the_mirror_come_from_the_journal(tmp_path):
+    path = str(tmp_path / "med.xlsx")
+    store = open_storage(path)
+    store.append_many([(f"Medicine {n}", "x", "") for n in range(5)])
+    list(store.rows())
+    assert os.path.exists(path + ".bin")
+    store.journal.append_many([(f"Medicine {n}", "x", "") for n in range(5, 8)])
+
+    assert [row[0] for row in store.rows(3)] == [f"Medicine {n}" for n in range(3, 8)]
+    assert [row[0] for row in store.rows(6)] == ["Medicine 6", "Medicine 7"]
+    assert list(store.rows(9)) == []
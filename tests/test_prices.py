@@ -0,0 +1,53 @@
+from models import Generic, Medicine
+from prices import Price, PriceIndex, parse_price, price_key
+
+
+def test_amount_currency_and_unit():
+    assert repr(parse_price("₹50 / 10 tab")) == repr(Price(50.0, "INR", "tab", 10.0))
+    assert repr(parse_price("Rs. 1,250.50")) == repr(Price(1250.5, "INR"))
+    assert repr(parse_price("$3.99 per 10 tabs")) == repr(Price(3.99, "USD", "tab", 10.0))
+    assert repr(parse_price("₹120 per box")) == repr(Price(120.0, "INR", "box"))
+    assert repr(parse_price(30)) == repr(Price(30.0))
+
+
+def test_pack_size_before_amount():
+    price = parse_price("10 tabs for 45 rs")
+    assert repr(price) == repr(Price(45.0, "INR", "tab", 10.0))
+    assert price.unit_amount == 4.5
+
+
+def test_decimal_comma_and_thousands():
+    assert parse_price("12,50").amount == 12.5
+    assert parse_price("1,250").amount == 1250.0
+
+
+def test_unparseable_and_ranges():
+    assert parse_price("approx 50-60") is None
+    assert parse_price("₹50 to ₹60") is None
+    assert parse_price("free sample") is None
+    assert parse_price(None) is None
+
+
+def test_typed_text_is_kept():
+    generic = Generic("Crocin", "Paracetamol 500mg", "approx 50-60")
+    assert generic.price == "approx 50-60"
+    assert generic.parsed_price is None
+    assert Generic("Dolo", "Paracetamol 650mg", "10 tabs for 45 rs").price == "10 tabs for 45 rs"
+
+
+def test_currencies_are_not_compared():
+    index = PriceIndex()
+    index.add("para", parse_price("$1"), "usd")
+    index.add("para", parse_price("₹40"), "inr")
+    index.add("para", parse_price("€2"), "eur")
+    assert index.cheapest("para") == ["inr"]
+    assert index.cheapest("para", currency="USD") == ["usd"]
+    assert index.between("para", 0, 100, currency="EUR") == ["eur"]
+
+
+def test_ranking_groups_by_currency():
+    medicine = Medicine("Crocin", "Paracetamol 500mg", generics=[
+        Generic("A", "", "$1"), Generic("B", "", "₹40"), Generic("C", "", "n/a"), Generic("D", "", "₹20"),
+    ])
+    assert [generic.name for generic in medicine.ranked_generics()] == ["D", "B", "A", "C"]
+    assert price_key(None) > price_key(parse_price("$1"))
@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from benchmarks.generate import make_catalogue
+from search import EXACT, FUZZY, PREFIX, SearchEngine
+
+SIZE = 3_000
+
+
+@pytest.fixture(scope="module")
+def catalogue():
+    rows = list(make_catalogue(SIZE, seed=7))
+    return rows, SearchEngine(rows)
+
+
+@pytest.fixture(scope="module")
+def names(catalogue):
+    rows, _ = catalogue
+    return [row[0] for row in random.Random(3).sample(rows, 200)]
+
+
+def test_exact_name_ranks_first(catalogue, names):
+    _, engine = catalogue
+    for name in names:
+        top = engine.search(name)[0]
+        assert (top.medicine, top.kind) == (name, EXACT)
+
+
+def test_prefix_finds_the_name(catalogue, names):
+    _, engine = catalogue
+    for name in names:
+        results = engine.search(name[:-1])
+        assert name in [result.medicine for result in results]
+        assert results[0].kind == PREFIX
+
+
+def test_one_typo_finds_the_name(catalogue, names):
+    _, engine = catalogue
+    for name in names:
+        # Drop a letter from the brand, away from the number that keeps names unique.
+        position = random.Random(name).randrange(1, name.index(" "))
+        results = engine.search(name[:position] + name[position + 1:])
+        assert name in [result.medicine for result in results]
+
+
+def test_misspelt_ingredient_matches_compositions(catalogue):
+    _, engine = catalogue
+    results = engine.search("Paracetmol")
+    assert len(results) == 10
+    assert all(result.kind == FUZZY and "paracetamol" in result.matched.casefold() for result in results)
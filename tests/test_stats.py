@@ -0,0 +1,12 @@
+from stats import StatsAggregator
+
+
+def test_prices_are_summarised_per_currency_and_unit():
+    row = ["Crocin", "Paracetamol 500mg", "2024-01-01",
+           "A", "", "$2", "", "B", "", "₹500", "", "C", "", "₹50 / 10 tab", "", "D", "", "approx 50-60", ""]
+    stats = StatsAggregator([row]).snapshot()
+
+    assert stats['priced_generics'] == 3
+    inr, usd = stats['prices']
+    assert (inr['currency'], inr['count'], inr['min'], inr['mean'], inr['max']) == ("INR", 2, 5.0, 252.5, 500.0)
+    assert (usd['currency'], usd['count'], usd['min'], usd['max']) == ("USD", 1, 2.0, 2.0)
@@ -0,0 +1,90 @@
+from storage import open_storage, workbook_checkpoint
+
+
+def rows(count, start=0):
+    return [(f"Medicine {n}", "Paracetamol 500mg", "2024-01-01 10:00:00") for n in range(start, start + count)]
+
+
+def crash_mid_compaction(store):
+    # The workbook is replaced with the journal rows, but the journal is never cleared.
+    journal_id = store.journal.ident()
+    pending = list(store.journal.rows())
+    store._write_rows(pending, f"{journal_id}:{len(pending)}")
+
+
+def names(path):
+    return [row[0] for row in open_storage(path).rows()]
+
+
+def test_reopen_skips_rows_a_crashed_compaction_saved(tmp_path):
+    path = str(tmp_path / "med.xlsx")
+    store = open_storage(path)
+    store.journal.append_many(rows(5))
+    crash_mid_compaction(store)
+    assert workbook_checkpoint(path, store.journal.ident()) == 5
+
+    assert names(path) == [f"Medicine {n}" for n in range(5)]
+
+
+def test_compaction_writes_only_unsaved_rows(tmp_path):
+    path = str(tmp_path / "med.xlsx")
+    store = open_storage(path)
+    store.journal.append_many(rows(5))
+    crash_mid_compaction(store)
+    store.journal.append_many(rows(2, start=5))
+    store.compact()
+
+    assert names(path) == [f"Medicine {n}" for n in range(7)]
+    assert len(store.journal) == 0
+
+
+def test_checkpoint_ignores_other_journals(tmp_path):
+    path = str(tmp_path / "med.xlsx")
+    store = open_storage(path)
+    store.append_group(rows(3))
+    store.compact()
+    store.journal.append_many(rows(2, start=3))
+
+    assert workbook_checkpoint(path, store.journal.ident()) == 0
+    store.compact()
+    assert names(path) == [f"Medicine {n}" for n in range(5)]
+
+
+def test_failed_compaction_does_not_fail_the_save(tmp_path):
+    from core import MedicineService
+
+    path = str(tmp_path / "med.xlsx")
+    service = MedicineService(open_storage(path)).load()
+    service.store.COMPACT_THRESHOLD = 1
+
+    def locked(*args, **kwargs):
+        raise PermissionError("workbook is open elsewhere")
+
+    service.store._write_rows = locked
+    service.add(["A", "Paracetamol 500mg"])
+    service.add(["B", "Paracetamol 500mg"])
+    service.compactor.join()
+
+    assert "b" in service.index
+    assert [row[0] for row in service.store.rows()] == ["A", "B"]
+    del service.store._write_rows
+    service.close()
+    assert names(path) == ["A", "B"]
+
+
+def test_recent_beyond_the_tail_cache_reads_the_mirror(tmp_path, monkeypatch):
+    import streaming
+
+    path = str(tmp_path / "med.xlsx")
+    store = open_storage(path)
+    store.append_many(rows(60))
+    list(store.rows())
+    store.journal.append_many(rows(2, start=60))
+
+    def scan(*args, **kwargs):
+        raise AssertionError("workbook scanned")
+
+    monkeypatch.setattr(streaming, "iter_rows", scan)
+    recent = store.recent(50)
+
+    assert [row[0] for row in recent] == [f"Medicine {n}" for n in range(12, 62)]
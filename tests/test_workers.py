@@ -0,0 +1,48 @@
+import time
+
+from workers import TkExecutor
+
+
+class StubRoot:
+    # Runs after() callbacks when pumped, standing in for the Tk mainloop.
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, callback):
+        self.scheduled.append(callback)
+
+    def pump(self, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while self.scheduled and time.monotonic() < deadline:
+            time.sleep(0.01)
+            self.scheduled.pop(0)()
+
+
+def test_raising_callback_does_not_stop_delivery():
+    root = StubRoot()
+    errors, results = [], []
+    executor = TkExecutor(root, on_callback_error=errors.append)
+
+    def broken(result):
+        raise RuntimeError("callback failed")
+
+    executor.submit(lambda: 1, on_done=broken)
+    executor.submit(lambda: 2, on_done=results.append)
+    root.pump()
+    executor.submit(lambda: 3, on_done=results.append)
+    root.pump()
+    executor.shutdown()
+
+    assert results == [2, 3]
+    assert [str(error) for error in errors] == ["callback failed"]
+
+
+def test_background_tasks_are_not_busy():
+    root = StubRoot()
+    busy = []
+    executor = TkExecutor(root, on_busy=busy.append)
+    executor.submit(time.sleep, 0.05, show_busy=False)
+    root.pump()
+    executor.shutdown()
+
+    assert set(busy) == {0}
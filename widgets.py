@@ -0,0 +1,116 @@
+import tkinter as tk
+from collections import OrderedDict
+from tkinter import ttk
+
+
+class VirtualList(tk.Frame):
+    # Renders only the rows that fit on screen and reuses their widgets while scrolling.
+    def __init__(self, parent, row_height, make_row, fill_row, bg, **kwargs):
+        super().__init__(parent, bg=bg, **kwargs)
+        self.row_height = row_height
+        self.make_row = make_row
+        self.fill_row = fill_row
+        self.bg = bg
+        self.count = 0
+        self.get_item = None
+        self.first = 0
+        self.pool = []
+
+        self.body = tk.Frame(self, bg=bg)
+        self.scrollbar = ttk.Scrollbar(self, orient='vertical', command=self.yview)
+        self.scrollbar.pack(side='right', fill='y')
+        self.body.pack(side='left', fill='both', expand=True)
+        self.body.bind('<Configure>', lambda e: self._resize(e.height))
+        self._bind_wheel(self)
+
+    def set_source(self, count, get_item):
+        self.count = count
+        self.get_item = get_item
+        self.first = max(0, min(self.first, count - len(self.pool)))
+        self.refresh()
+
+    def set_row_height(self, row_height):
+        if row_height != self.row_height:
+            self.row_height = row_height
+            self._resize(self.body.winfo_height())
+
+    def refresh(self):
+        for offset, widget in enumerate(self.pool):
+            index = self.first + offset
+            if index < self.count:
+                self.fill_row(widget, self.get_item(index))
+                widget.place(x=0, y=offset * self.row_height, relwidth=1, height=self.row_height)
+            else:
+                widget.place_forget()
+        self._update_scrollbar()
+
+    def scroll(self, rows):
+        self._scroll_to(self.first + rows)
+
+    def yview(self, *args):
+        visible = max(len(self.pool), 1)
+        if args[0] == 'moveto':
+            self._scroll_to(int(float(args[1]) * self.count))
+        elif args[0] == 'scroll':
+            step = int(args[1]) * (visible if args[2] == 'pages' else 1)
+            self._scroll_to(self.first + step)
+
+    def _scroll_to(self, first):
+        first = max(0, min(first, self.count - len(self.pool)))
+        if first != self.first:
+            self.first = first
+            self.refresh()
+
+    def _resize(self, height):
+        wanted = max(1, height // self.row_height)
+        while len(self.pool) < wanted:
+            widget = self.make_row(self.body)
+            self._bind_wheel(widget)
+            self.pool.append(widget)
+        while len(self.pool) > wanted:
+            self.pool.pop().destroy()
+        self.first = max(0, min(self.first, self.count - len(self.pool)))
+        self.refresh()
+
+    def _bind_wheel(self, widget):
+        widget.bind('<MouseWheel>', self._on_wheel)
+        widget.bind('<Button-4>', lambda e: self.scroll(-1))
+        widget.bind('<Button-5>', lambda e: self.scroll(1))
+        for child in widget.winfo_children():
+            self._bind_wheel(child)
+
+    def _on_wheel(self, event):
+        self.scroll(-1 if event.delta > 0 else 1)
+
+    def _update_scrollbar(self):
+        if not self.count:
+            self.scrollbar.set(0, 1)
+            return
+        self.scrollbar.set(self.first / self.count, min(1, (self.first + len(self.pool)) / self.count))
+
+
+class PagedSource:
+    # Random access over fetch_page(offset, limit), keeping only a few pages in memory.
+    def __init__(self, fetch_page, page_size=100, max_pages=8):
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.pages = OrderedDict()
+
+    def __call__(self, index):
+        number, offset = divmod(index, self.page_size)
+        page = self.pages.get(number)
+        if page is None:
+            page = self.fetch_page(number * self.page_size, self.page_size)
+            self.pages[number] = page
+            if len(self.pages) > self.max_pages:
+                self.pages.popitem(last=False)
+        else:
+            self.pages.move_to_end(number)
+        return page[offset] if offset < len(page) else None
+
+    def invalidate(self, index=0):
+        # Drops the pages at and after index; earlier pages are unaffected by an insert there.
+        first = index // self.page_size
+        for number in [number for number in self.pages if number >= first]:
+            del self.pages[number]
@@ -0,0 +1,89 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+POLL_INTERVAL_MS = 50
+
+
+class Task:
+    def __init__(self, future, on_done, on_error, cancellable, show_busy):
+        self.future = future
+        self.on_done = on_done
+        self.on_error = on_error
+        self.cancellable = cancellable
+        self.show_busy = show_busy
+        self.cancelled = False
+
+    def cancel(self):
+        if not self.cancellable:
+            return False
+        # A task that is already running cannot be interrupted; its result is dropped instead.
+        self.future.cancel()
+        self.cancelled = True
+        return True
+
+
+class TkExecutor:
+    def __init__(self, root, max_workers=4, on_busy=None, on_callback_error=None):
+        self.root = root
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="medicine-io")
+        self.on_busy = on_busy
+        # Called with any exception raised by an on_done/on_error callback; defaults to Tk's own report.
+        self.on_callback_error = on_callback_error
+        self.tasks = []
+        self._polling = False
+
+    def submit(self, fn, *args, on_done=None, on_error=None, cancellable=True, show_busy=True):
+        # Background housekeeping passes show_busy=False so it never lights the busy indicator.
+        task = Task(self.pool.submit(fn, *args), on_done, on_error, cancellable, show_busy)
+        self.tasks.append(task)
+        self._notify()
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_INTERVAL_MS, self._poll)
+        return task
+
+    def cancel_all(self):
+        for task in self.tasks:
+            task.cancel()
+        self._notify()
+
+    @property
+    def busy(self):
+        return sum(1 for task in self.tasks if task.show_busy and not task.cancelled)
+
+    def _poll(self):
+        # A raising callback must not stop delivery for every later task, so each one is isolated
+        # and the next poll is always scheduled.
+        try:
+            finished = [task for task in self.tasks if task.cancelled or task.future.done()]
+            for task in finished:
+                self.tasks.remove(task)
+                if not task.cancelled:
+                    self._deliver(task)
+            if finished:
+                self._notify()
+        finally:
+            self._polling = bool(self.tasks)
+            if self._polling:
+                self.root.after(POLL_INTERVAL_MS, self._poll)
+
+    def _deliver(self, task):
+        try:
+            error = task.future.exception()
+            if error is not None:
+                if task.on_error:
+                    task.on_error(error)
+            elif task.on_done:
+                task.on_done(task.future.result())
+        except Exception as e:
+            if self.on_callback_error:
+                self.on_callback_error(e)
+            else:
+                self.root.report_callback_exception(*sys.exc_info())
+
+    def _notify(self):
+        if self.on_busy:
+            self.on_busy(self.busy)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=True, cancel_futures=False)